@@ -0,0 +1,116 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Seconds a token -> user lookup is trusted in the shared cache, and in each
+# process. The process level can't be invalidated from elsewhere, so it is
+# kept short: a suspended user or deleted token stops working within LOCAL_TTL.
+SHARED_TTL = 60
+LOCAL_TTL = 5
+LOCAL_MAX_ENTRIES = 1024
+
+TOKEN_CACHE_PREFIX = "auth_token_"
+
+
+class LocalTokenCache:
+    """Thread-safe LRU of cache key -> (expiry, user) with a per-entry TTL"""
+
+    def __init__(self, max_entries=LOCAL_MAX_ENTRIES, ttl=LOCAL_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_users(self, user_ids):
+        with self._lock:
+            for key in [key for key, (_, user) in self._entries.items() if user.pk in user_ids]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_token_cache = LocalTokenCache()
+
+
+def token_cache_key(key):
+    # Hashed so raw tokens never end up in the cache backend
+    return TOKEN_CACHE_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    cache_key = token_cache_key(key)
+    local_token_cache.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def invalidate_user_tokens(user_ids):
+    """Forget the cached lookups of every token belonging to `user_ids`"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    local_token_cache.delete_users(user_ids)
+    keys = Token.objects.filter(user_id__in=user_ids).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in TokenAuthentication that caches token -> user lookups, first in a
+    per-process LRU and then in the shared cache, so most requests authenticate
+    without touching the database.
+
+    Cached entries are dropped when a token is deleted and when its user is
+    saved (see authentication.signals). Code changing user columns with
+    QuerySet.update() must call invalidate_user_tokens() itself, and views
+    saving request.user pass update_fields, so a cached copy never writes
+    stale columns back.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user = local_token_cache.get(cache_key)
+        if user is None:
+            user = cache.get(cache_key)
+            if user is None:
+                user, _token = super().authenticate_credentials(key)
+                cache.set(cache_key, user, SHARED_TTL)
+            local_token_cache.set(cache_key, user)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        # Views may modify request.user, so each request gets its own copy
+        user = copy.copy(user)
+        return user, Token(key=key, user=user)
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission,User
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import FileExtensionValidator
 
 
@@ -34,6 +36,13 @@ class CustomUser(AbstractUser):
 
     class Meta:
         db_table = 'custom_user'  # Explicit table name
+        indexes = [
+            # Trigram indexes for the admin user search. icontains compares UPPER(column),
+            # so the indexed expressions are upper-cased too.
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='custom_user_email_trgm'),
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='custom_user_first_name_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='custom_user_last_name_trgm'),
+        ]
 
 
 class Merchant(CustomUser):
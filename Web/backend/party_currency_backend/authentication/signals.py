@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from rest_framework.authtoken.models import Token
+from .backends import invalidate_token, invalidate_user_tokens
+from .models import CustomUser, Merchant
+
+# Saves touching only these fields leave the cached user good enough to authenticate
+UNCACHED_FIELDS = {'last_login'}
+
+
+def invalidate_on_user_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= UNCACHED_FIELDS:
+        return
+    invalidate_user_tokens([instance.pk])
+
+
+def invalidate_on_token_delete(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+# QuerySet.update() doesn't send post_save; bulk updates of users call
+# invalidate_user_tokens() themselves. Deleted users cascade to their tokens.
+for model in (CustomUser, Merchant):
+    post_save.connect(invalidate_on_user_save, sender=model, dispatch_uid=f"token_cache_save_{model.__name__}")
+post_delete.connect(invalidate_on_token_delete, sender=Token, dispatch_uid="token_cache_delete")
@@ -4,6 +4,8 @@ import string
 from datetime import timedelta
 from django.utils import timezone
 from django.conf import settings
+from rest_framework.authtoken.models import Token
+from .models import CustomUser
 
 class PasswordResetCodeManager:
     CODE_LENGTH = 6
@@ -63,3 +65,37 @@ class PasswordResetCodeManager:
         cache.delete(cache_key)
         return True
 
+
+
+# A login within this long of the recorded one doesn't write last_login again
+LAST_LOGIN_INTERVAL = timedelta(minutes=1)
+
+
+def get_login_user(**lookup):
+    """
+    Fetch a user together with their auth token in one query, without the
+    profile picture which login never reads
+    """
+    return CustomUser.objects.select_related('auth_token').defer('profile_picture').get(**lookup)
+
+
+def get_login_token(user):
+    """Token prefetched by get_login_user, created only for users without one"""
+    try:
+        return user.auth_token
+    except Token.DoesNotExist:
+        token, _ = Token.objects.get_or_create(user=user)
+        return token
+
+
+def record_login(user):
+    """
+    Set last_login with an UPDATE of that column alone. Repeated logins within
+    LAST_LOGIN_INTERVAL are coalesced into the first, so a burst of logins at an
+    event's start doesn't queue up on the user rows.
+    """
+    now = timezone.now()
+    if user.last_login and now - user.last_login < LAST_LOGIN_INTERVAL:
+        return
+    CustomUser.objects.filter(pk=user.pk).update(last_login=now)
+    user.last_login = now
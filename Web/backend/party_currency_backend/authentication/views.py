@@ -12,7 +12,7 @@ from rest_framework.decorators import permission_classes,throttle_classes
 from .utils import PasswordResetCodeManager as prcm
 from django.core.mail import send_mail
 from rest_framework.throttling import AnonRateThrottle
-from .utils import PasswordResetCodeManager as prcm
+from .utils import PasswordResetCodeManager as prcm, get_login_user, get_login_token, record_login
 import os
 
 
@@ -101,7 +101,7 @@ def google_callback(request):
         
         # Check if user exists, otherwise create a new one
         try:
-            user = CUser.objects.get(email=email)
+            user = get_login_user(email=email)
         except CUser.DoesNotExist:
             # Create a new user
             user = CUser.objects.create_user(
@@ -114,11 +114,10 @@ def google_callback(request):
             )
         
         # Update last login
-        user.last_login = timezone.now()
-        user.save()
+        record_login(user)
         
         # Create or get token for the user
-        token, _ = Token.objects.get_or_create(user=user)
+        token = get_login_token(user)
         
         # Decide how to return based on request method
         if request.method == "GET":
@@ -157,15 +156,14 @@ def login(request):
         return Response({"message": "Email and password are required"}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        user = CUser.objects.get(username=email)
+        user = get_login_user(username=email)
         if not user.check_password(password):
             return Response({"message": "invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
         
         # Update last login
-        user.last_login = timezone.now()
-        user.save()
+        record_login(user)
         
-        token, _ = Token.objects.get_or_create(user=user)
+        token = get_login_token(user)
         if user.is_superuser:
             return Response({"message": "Admin Login, Use api/users/profile to get user details passing this token as authorization, use api/admin for admin operations",
                              "token": token.key,
@@ -243,7 +241,6 @@ def signupMerchant(request):
 
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from dj_rest_auth.registration.views import SocialLoginView
-from django.utils import timezone
 
 class GoogleLogin(SocialLoginView):
     adapter_class = GoogleOAuth2Adapter
@@ -344,7 +341,7 @@ def reset_password(request):
 
         user = request.user
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=['password'])
 
         # Optionally invalidate all tokens after password reset
         Token.objects.filter(user=user).delete()
@@ -376,7 +373,7 @@ def change_password(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     user.set_password(request.data['confirmpassword'])
-    user.save()
+    user.save(update_fields=['password'])
     return Response ({
             "message":"password changed successfully"
         },status=status.HTTP_200_OK)
\ No newline at end of file
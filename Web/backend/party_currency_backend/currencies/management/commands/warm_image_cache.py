@@ -0,0 +1,49 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from currencies.models import Currency
+from currencies.utils import extract_file_id_from_url
+from events.models import Events
+from google_drive.cache import drive_cache
+
+
+class Command(BaseCommand):
+    help = "Download the Drive images of currencies for upcoming events into the local image cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Warm currencies of events starting within this many days (default: 30)",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        event_ids = Events.objects.filter(
+            end_date__gte=today,
+            start_date__lte=today + timedelta(days=options["days"]),
+        ).values_list("event_id", flat=True)
+
+        image_urls = Currency.objects.filter(event_id__in=event_ids).values_list("front_image", "back_image")
+        file_ids = {
+            extract_file_id_from_url(url)
+            for urls in image_urls
+            for url in urls
+        }
+        file_ids.discard(None)
+
+        warmed = skipped = failed = 0
+        for file_id in sorted(file_ids):
+            try:
+                if drive_cache.fetch(file_id) is None:
+                    skipped += 1
+                else:
+                    warmed += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Failed to cache {file_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached {warmed} images ({skipped} too large to cache, {failed} failed)"
+        ))
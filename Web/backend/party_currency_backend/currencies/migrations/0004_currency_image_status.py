@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies', '0003_currency_denomination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currency',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies', '0004_currency_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currency',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
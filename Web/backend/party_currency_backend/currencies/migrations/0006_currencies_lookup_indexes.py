@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so the tables stay writable during deploys
+    atomic = False
+
+    dependencies = [
+        ('currencies', '0005_currency_renditions'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='currency',
+            index=models.Index(fields=['event_id', '-created_at'], name='currency_event_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='currency',
+            index=models.Index(fields=['currency_author', '-created_at'], name='currency_author_created_idx'),
+        ),
+    ]
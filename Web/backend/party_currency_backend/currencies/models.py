@@ -9,6 +9,13 @@ class Currency(models.Model):
         (200, '200'),
         (100, '100'),
     ]
+
+    # Front/back images are uploaded to Drive by a Celery worker after the currency is saved
+    IMAGE_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
     
     currency_id = models.CharField(max_length=255, unique=True, primary_key=True)
     currency_author = models.CharField(max_length=255, default="user")
@@ -21,6 +28,15 @@ class Currency(models.Model):
     front_image = models.TextField(null=True)
     back_image = models.TextField(null=True)
     back_celebration_text = models.CharField(max_length=255, default="Party Currency")
+    image_status = models.CharField(max_length=20, choices=IMAGE_STATUS_CHOICES, default='ready')
+    # Resized copies of the images, e.g. {"front_image": {"thumb": {"width", "height", "jpeg", "webp"}}}
+    renditions = models.JSONField(default=dict, blank=True)
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # Currencies of an event
+            models.Index(fields=['event_id', '-created_at'], name='currency_event_created_idx'),
+            # A user's currencies
+            models.Index(fields=['currency_author', '-created_at'], name='currency_author_created_idx'),
+        ]
@@ -0,0 +1,116 @@
+import os
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+# A4 portrait at 300 dpi
+SHEET_DPI = 300
+SHEET_SIZE = (2480, 3508)
+SHEET_MARGIN = 118  # 10 mm
+
+# Notes per sheet
+GRID_COLUMNS = 2
+GRID_ROWS = 4
+
+CELL_PADDING = 24
+CAPTION_HEIGHT = 64
+CROP_MARK_LENGTH = 30
+HEADER_FONT_SIZE = 36
+CAPTION_FONT_SIZE = 40
+
+
+def _note_boxes(mirror=False):
+    """
+    Yield the (left, top, width, height) box of every note on a sheet.
+
+    Back sheets mirror the columns so that after long-edge duplex printing each
+    back lands behind its front.
+    """
+    cell_width = (SHEET_SIZE[0] - 2 * SHEET_MARGIN) // GRID_COLUMNS
+    cell_height = (SHEET_SIZE[1] - 2 * SHEET_MARGIN) // GRID_ROWS
+    for row in range(GRID_ROWS):
+        for column in range(GRID_COLUMNS):
+            if mirror:
+                column = GRID_COLUMNS - 1 - column
+            yield (
+                SHEET_MARGIN + column * cell_width + CELL_PADDING,
+                SHEET_MARGIN + row * cell_height + CELL_PADDING,
+                cell_width - 2 * CELL_PADDING,
+                cell_height - 2 * CELL_PADDING,
+            )
+
+
+def _draw_crop_marks(draw, left, top, right, bottom):
+    for x, y, dx, dy in (
+        (left, top, -1, -1), (right, top, 1, -1),
+        (left, bottom, -1, 1), (right, bottom, 1, 1),
+    ):
+        draw.line([(x + dx * 4, y), (x + dx * (4 + CROP_MARK_LENGTH), y)], fill="black", width=2)
+        draw.line([(x, y + dy * 4), (x, y + dy * (4 + CROP_MARK_LENGTH))], fill="black", width=2)
+
+
+def compose_page(image_path, caption, header, mirror=False):
+    """
+    Lay one side of a note out GRID_COLUMNS x GRID_ROWS times on a sheet, with its
+    celebration text underneath each copy and crop marks around it.
+    """
+    page = Image.new("RGB", SHEET_SIZE, "white")
+    draw = ImageDraw.Draw(page)
+    caption_font = ImageFont.load_default(size=CAPTION_FONT_SIZE)
+    header_font = ImageFont.load_default(size=HEADER_FONT_SIZE)
+
+    note = None
+    if image_path:
+        with Image.open(image_path) as source:
+            note = ImageOps.exif_transpose(source).convert("RGB")
+
+    for left, top, width, height in _note_boxes(mirror):
+        note_height = height - (CAPTION_HEIGHT if caption else 0)
+        if note is not None:
+            fitted = ImageOps.contain(note, (width, note_height), Image.LANCZOS)
+            note_left = left + (width - fitted.width) // 2
+            note_top = top + (note_height - fitted.height) // 2
+            page.paste(fitted, (note_left, note_top))
+            _draw_crop_marks(draw, note_left, note_top, note_left + fitted.width, note_top + fitted.height)
+        else:
+            draw.rectangle([left, top, left + width, top + note_height], outline="black", width=2)
+        if caption:
+            draw.text(
+                (left + width // 2, top + note_height + CAPTION_HEIGHT // 2),
+                caption, fill="black", font=caption_font, anchor="mm"
+            )
+
+    draw.text((SHEET_MARGIN, SHEET_MARGIN // 2), header, fill="black", font=header_font, anchor="lm")
+    return page
+
+
+def render_sheet(job):
+    """
+    Render the print sheet of one currency design. Runs in a pool worker process,
+    so it only takes and returns plain, picklable values.
+
+    Args:
+        job: dict with front_path, back_path, front_text, back_text, label,
+             output_dir, output_format ("pdf" or "png") and copies (pdf only;
+             a png sheet is one image per side)
+
+    Returns:
+        list of the files written
+    """
+    if job["output_format"] != "pdf" and job["copies"] != 1:
+        raise ValueError("copies is only supported for pdf output")
+
+    front = compose_page(job["front_path"], job["front_text"], f"{job['label']} - front")
+    back = compose_page(job["back_path"], job["back_text"], f"{job['label']} - back", mirror=True)
+
+    base_name = os.path.join(job["output_dir"], job["label"].replace(" ", "_"))
+    if job["output_format"] == "pdf":
+        # One duplex pair (front, back) per copy
+        output_path = f"{base_name}.pdf"
+        pages = [back] + [front, back] * (job["copies"] - 1)
+        front.save(output_path, "PDF", resolution=SHEET_DPI, save_all=True, append_images=pages)
+        return [output_path]
+
+    front_path = f"{base_name}_front.png"
+    back_path = f"{base_name}_back.png"
+    front.save(front_path, "PNG", dpi=(SHEET_DPI, SHEET_DPI), optimize=True)
+    back.save(back_path, "PNG", dpi=(SHEET_DPI, SHEET_DPI), optimize=True)
+    return [front_path, back_path]
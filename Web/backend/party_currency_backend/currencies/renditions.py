@@ -0,0 +1,89 @@
+import io
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+from google_drive.utils import upload_fileobj_to_drive
+from .utils import drive_view_url
+
+logger = logging.getLogger(__name__)
+
+# Longest edge, in pixels, of each rendition. Images are never upscaled.
+RENDITION_SIZES = {
+    "thumb": 320,
+    "preview": 960,
+    "print": 2400,
+}
+
+# Pillow save options per output format
+FORMAT_OPTIONS = {
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True},
+    "png": {"format": "PNG", "optimize": True},
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+}
+
+CONTENT_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+EXTENSIONS = {
+    "jpeg": ".jpg",
+    "png": ".png",
+    "webp": ".webp",
+}
+
+
+def generate_renditions(image_file):
+    """
+    Render every RENDITION_SIZES size of an image, as WebP plus JPEG (or PNG for
+    images with transparency).
+
+    Returns:
+        list of (size name, format, BytesIO, width, height)
+    """
+    with Image.open(image_file) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    fallback_format = "png" if has_alpha else "jpeg"
+    renditions = []
+    for size_name, longest_edge in RENDITION_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((longest_edge, longest_edge), Image.LANCZOS)
+        for image_format in (fallback_format, "webp"):
+            buffer = io.BytesIO()
+            resized.save(buffer, **FORMAT_OPTIONS[image_format])
+            buffer.seek(0)
+            renditions.append((size_name, image_format, buffer, resized.width, resized.height))
+    return renditions
+
+
+def upload_renditions(staged_path, currency_id, image_type):
+    """
+    Generate the renditions of a staged image and upload them to Google Drive.
+
+    Returns:
+        dict: {size name: {"width", "height", <format>: Drive URL, ...}}
+    """
+    with default_storage.open(staged_path, "rb") as staged_file:
+        renditions = generate_renditions(staged_file)
+
+    folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
+
+    def upload(rendition):
+        size_name, image_format, buffer, _, _ = rendition
+        file_name = f"{currency_id}_{image_type}_{size_name}{EXTENSIONS[image_format]}"
+        return upload_fileobj_to_drive(buffer, file_name, folder_id, CONTENT_TYPES[image_format])
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        file_ids = list(pool.map(upload, renditions))
+
+    result = {}
+    for (size_name, image_format, _, width, height), file_id in zip(renditions, file_ids):
+        entry = result.setdefault(size_name, {"width": width, "height": height})
+        entry[image_format] = drive_view_url(file_id)
+    return result
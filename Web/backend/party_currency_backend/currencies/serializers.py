@@ -15,7 +15,9 @@ class CurrencySerializer(serializers.ModelSerializer):
             'front_celebration_text',
             'front_image',
             'back_image',
-            'back_celebration_text'
+            'back_celebration_text',
+            'image_status',
+            'renditions'
         ]
         
-        read_only_fields = ['currency_id', 'created_at', 'updated_at'] 
\ No newline at end of file
+        read_only_fields = ['currency_id', 'created_at', 'updated_at', 'image_status', 'renditions'] 
\ No newline at end of file
@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import tempfile
+from billiard import Pool
+from celery import shared_task
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from google_drive.cache import drive_cache
+from google_drive.utils import iter_file_chunks
+from .models import Currency
+from .printing import render_sheet
+from .renditions import upload_renditions
+from .utils import upload_staged_image, discard_staged_images, extract_file_id_from_url
+
+logger = logging.getLogger(__name__)
+
+# Progress of print sheet jobs is kept in the cache so any web worker can report it
+PRINT_JOB_PREFIX = "print_job_"
+PRINT_JOB_TTL = 24 * 60 * 60
+PRINT_SHEETS_PREFIX = "print_sheets"
+
+
+def upload_image_with_renditions(staged_path, currency_id, image_type):
+    """
+    Upload a staged image and its renditions. A failed rendition is logged but does
+    not fail the image itself.
+    """
+    url = upload_staged_image(staged_path, currency_id, image_type)
+    try:
+        renditions = upload_renditions(staged_path, currency_id, image_type)
+    except Exception as e:
+        logger.error(f"Generating renditions of {image_type} for currency {currency_id} failed: {e}")
+        renditions = {}
+    return url, renditions
+
+
+def save_renditions(currency_id, renditions):
+    """Merge per-image renditions into Currency.renditions"""
+    with transaction.atomic():
+        currency = Currency.objects.select_for_update().only("currency_id", "renditions").get(currency_id=currency_id)
+        currency.renditions = {**currency.renditions, **renditions}
+        currency.save(update_fields=["renditions"])
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def upload_currency_images_task(self, currency_id, staged):
+    """
+    Upload the staged front/back images of a currency to Google Drive in parallel
+    and patch the Drive URLs onto the currency.
+
+    Args:
+        currency_id: The currency the images belong to
+        staged: Mapping of image field ("front_image"/"back_image") to staging path
+
+    Each image's thumb/preview/print renditions are generated and uploaded along
+    with it. Sides that upload successfully are saved straight away; only the
+    failed ones are retried. Once retries run out the currency is marked as failed.
+    """
+    urls = {}
+    renditions = {}
+    failed = {}
+    with ThreadPoolExecutor(max_workers=max(len(staged), 1)) as pool:
+        futures = {
+            image_type: pool.submit(upload_image_with_renditions, path, currency_id, image_type)
+            for image_type, path in staged.items()
+        }
+        for image_type, future in futures.items():
+            try:
+                urls[image_type], renditions[image_type] = future.result()
+            except Exception as e:
+                logger.error(f"Uploading {image_type} for currency {currency_id} failed: {e}")
+                failed[image_type] = e
+
+    if urls:
+        Currency.objects.filter(currency_id=currency_id).update(updated_at=timezone.now(), **urls)
+        save_renditions(currency_id, renditions)
+        discard_staged_images(staged[image_type] for image_type in urls)
+
+    if not failed:
+        Currency.objects.filter(currency_id=currency_id).update(image_status='ready')
+        return urls
+
+    remaining = {image_type: staged[image_type] for image_type in failed}
+    if self.request.retries < self.max_retries:
+        raise self.retry(args=(currency_id, remaining), exc=next(iter(failed.values())))
+
+    Currency.objects.filter(currency_id=currency_id).update(image_status='failed')
+    discard_staged_images(remaining.values())
+    return urls
+
+
+def get_print_job_status(job_id):
+    return cache.get(f"{PRINT_JOB_PREFIX}{job_id}")
+
+
+def set_print_job_status(job_id, **fields):
+    status = get_print_job_status(job_id) or {}
+    status.update(fields)
+    cache.set(f"{PRINT_JOB_PREFIX}{job_id}", status, timeout=PRINT_JOB_TTL)
+    return status
+
+
+def local_image_path(image_url, work_dir):
+    """Return a local copy of a Drive-hosted currency image, or None if there is no image"""
+    file_id = extract_file_id_from_url(image_url)
+    if not file_id:
+        return None
+    path = drive_cache.fetch(file_id)
+    if path is not None:
+        return str(path)
+    # Too large for the image cache: download it for this job only
+    path = os.path.join(work_dir, file_id)
+    with open(path, "wb") as image_file:
+        for chunk in iter_file_chunks(file_id):
+            image_file.write(chunk)
+    return path
+
+
+@shared_task(bind=True)
+def render_print_sheets_task(self, job_id, event_id, output_format="pdf", copies=1):
+    """
+    Render print-ready sheets for every currency design of an event.
+
+    Each design becomes one sheet (front and mirrored back for duplex printing)
+    rendered in a process pool across all cores. Progress and the resulting
+    storage paths are published through get_print_job_status(job_id).
+    """
+    currencies = list(Currency.objects.filter(event_id=event_id).order_by("denomination", "currency_id"))
+    set_print_job_status(job_id, state="running", event_id=event_id, total=len(currencies), done=0, files=[])
+
+    files = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            jobs = []
+            for currency in currencies:
+                label = "_".join(str(part) for part in (event_id, currency.denomination, currency.currency_id) if part)
+                jobs.append({
+                    "front_path": local_image_path(currency.front_image, work_dir),
+                    "back_path": local_image_path(currency.back_image, work_dir),
+                    "front_text": currency.front_celebration_text,
+                    "back_text": currency.back_celebration_text,
+                    "label": label,
+                    "output_dir": work_dir,
+                    "output_format": output_format,
+                    "copies": copies,
+                })
+
+            pool = Pool(processes=max(min(os.cpu_count() or 1, len(jobs)), 1))
+            try:
+                for done, written in enumerate(pool.imap_unordered(render_sheet, jobs), start=1):
+                    for path in written:
+                        with open(path, "rb") as sheet:
+                            name = f"{PRINT_SHEETS_PREFIX}/{event_id}/{job_id}/{os.path.basename(path)}"
+                            files.append(default_storage.save(name, File(sheet)))
+                        os.remove(path)
+                    set_print_job_status(job_id, done=done, files=files)
+            finally:
+                pool.close()
+                pool.join()
+    except Exception as e:
+        logger.exception(f"Rendering print sheets for event {event_id} failed: {e}")
+        set_print_job_status(job_id, state="failed", error=str(e), files=files)
+        raise
+
+    set_print_job_status(job_id, state="done", files=files)
+    return files
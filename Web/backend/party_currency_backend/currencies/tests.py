@@ -1,3 +1,93 @@
+from datetime import date
+from unittest import mock, skipUnless
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from events.models import Events
+from party_currency_backend.testing import IndexPlanTestMixin
+from .models import Currency
 
 # Create your tests here.
+
+
+@skipUnless(connection.vendor == 'postgresql', "EXPLAIN plans are PostgreSQL specific")
+class CurrencyIndexTests(IndexPlanTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.bulk_create([
+            Currency(
+                currency_id=f"CUR{i:05d}",
+                currency_author=f"user{i % 300}",
+                event_id=f"EVT{i % 300:05d}",
+                denomination=(1000, 500, 200, 100)[i % 4],
+            )
+            for i in range(3000)
+        ])
+        cls.analyze(Currency)
+
+    def test_currencies_of_event(self):
+        self.assertUsesIndex(Currency.objects.filter(event_id="EVT00042"), "currency_event_created_idx")
+
+    def test_currencies_of_author(self):
+        self.assertUsesIndex(Currency.objects.filter(currency_author="user7"), "currency_author_created_idx")
+
+
+class CurrencyWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="ada@example.com", email="ada@example.com", password="password1")
+        Events.objects.create(
+            event_id="EVT00001", event_name="Wedding", event_author=cls.user.username,
+            start_date=date.today(), end_date=date.today(), delivery_address="Lagos",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unknown_event_leaves_nothing_behind(self):
+        with mock.patch('currencies.views.upload_currency_images_task.delay') as delay:
+            response = self.client.post("/currencies/save-currency", {"event_id": "EVTMISSING", "denomination": 500})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Currency.objects.exists())
+        delay.assert_not_called()
+
+    def test_upload_result_is_not_overwritten(self):
+        def upload(currency_id, staged):
+            Currency.objects.filter(currency_id=currency_id).update(front_image="https://drive/x", image_status="ready")
+
+        with mock.patch('currencies.views.stage_images', return_value={"front_image": "staged/front.png"}), \
+                mock.patch('currencies.views.upload_currency_images_task.delay', side_effect=upload) as delay, \
+                mock.patch('currencies.views.transaction.on_commit', side_effect=lambda func: func()):
+            # In autocommit on_commit callbacks run straight away
+            response = self.client.post("/currencies/save-currency", {
+                "event_id": "EVT00001", "currency_name": "Naira", "denomination": 500,
+                "front_celebration_text": "Happy", "back_celebration_text": "Wedding",
+            })
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once()
+        currency = Currency.objects.get(currency_id=response.json()["currency_id"])
+        self.assertEqual((currency.front_image, currency.image_status), ("https://drive/x", "ready"))
+
+    def test_edit_keeps_images_uploaded_meanwhile(self):
+        Currency.objects.create(
+            currency_id="CUR00001", currency_author=self.user.username, event_id="EVT00001",
+            front_image="https://drive/old", image_status="pending",
+        )
+
+        def finish_upload(request, currency_id):
+            # The worker of an earlier upload lands after the view has read the row
+            Currency.objects.filter(currency_id=currency_id).update(front_image="https://drive/new", image_status="ready")
+            return {}
+
+        with mock.patch('currencies.views.stage_images', side_effect=finish_upload):
+            response = self.client.put("/currencies/update-currency/CUR00001", {
+                "event_id": "EVT00001", "currency_name": "Naira", "denomination": 500,
+            })
+        self.assertEqual(response.status_code, 200)
+        currency = Currency.objects.get(currency_id="CUR00001")
+        self.assertEqual(
+            (currency.currency_name, currency.front_image, currency.image_status),
+            ("Naira", "https://drive/new", "ready"),
+        )
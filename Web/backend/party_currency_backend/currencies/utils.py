@@ -0,0 +1,99 @@
+import os
+import re
+import uuid
+from django.core.files.storage import default_storage
+from google_drive.utils import upload_fileobj_to_drive
+
+# Uploaded currency images wait here until a Celery worker has pushed them to Drive
+STAGING_PREFIX = "currency_uploads"
+
+
+def drive_view_url(file_id):
+    """Public Drive URL stored on Currency.front_image/back_image"""
+    return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+
+
+def extract_file_id_from_url(drive_url):
+    """Extract file ID from Google Drive URL"""
+    if not drive_url:
+        return None
+    
+    # Pattern to match Google Drive file URLs
+    pattern = r'https://drive\.google\.com/file/d/([^/]+)'
+    match = re.search(pattern, drive_url)
+    
+    if match:
+        return match.group(1)
+    return None
+
+
+def stage_image(image_file, currency_id, image_type):
+    """
+    Save an uploaded image to the staging area and return its storage path.
+
+    The storage backend copies the upload chunk by chunk, so the image is never
+    held in memory as a whole.
+    """
+    extension = os.path.splitext(image_file.name)[1]
+    staged_name = f"{STAGING_PREFIX}/{currency_id}/{image_type}_{uuid.uuid4().hex}{extension}"
+    return default_storage.save(staged_name, image_file)
+
+
+def discard_staged_images(staged_paths):
+    """Delete staged images, ignoring ones that are already gone"""
+    for path in staged_paths:
+        if path and default_storage.exists(path):
+            default_storage.delete(path)
+
+
+def upload_staged_image(staged_path, currency_id, image_type):
+    """Upload a staged image to Google Drive and return its shareable URL"""
+    file_name = f"{currency_id}_{image_type}{os.path.splitext(staged_path)[1]}"
+    folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
+    with default_storage.open(staged_path, 'rb') as staged_file:
+        file_id = upload_fileobj_to_drive(staged_file, file_name, folder_id)
+    return drive_view_url(file_id)
+
+
+def sniff_content_type(header):
+    """Guess (content type, file extension) from the first bytes of a file"""
+    if header.startswith(b'\xFF\xD8'):
+        return "image/jpeg", ".jpg"
+    if header.startswith(b'\x89PNG'):
+        return "image/png", ".png"
+    if header.startswith(b'GIF87a') or header.startswith(b'GIF89a'):
+        return "image/gif", ".gif"
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return "image/webp", ".webp"
+    if header.startswith(b'%PDF'):
+        return "application/pdf", ".pdf"
+    return "application/octet-stream", ""
+
+
+def parse_range_header(range_header, size):
+    """
+    Parse a single-range HTTP `Range` header against a file of `size` bytes.
+
+    Returns:
+        (start, end) inclusive byte offsets, or None when the header is absent or
+        not something we serve partially (multiple ranges, other units)
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, _, last = range_header[len("bytes="):].strip().partition("-")
+    if not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        # Malformed ranges are ignored and the whole file is served
+        return None
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1 if int(last) else -1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
@@ -9,19 +9,20 @@ from django.utils import timezone
 from datetime import datetime
 import pytz
 from google_drive.models import GoogleDriveFile
-from google_drive.utils import upload_file_to_drive, download_file_from_drive  # Added download function import
+from google_drive.utils import iter_file_chunks
+from google_drive.cache import drive_cache
 from authentication.models import CustomUser
-from django.core.files.storage import default_storage
 import os
-import re  # Added for regex pattern matching
-from django.core.files.base import ContentFile
-from django.http import FileResponse, HttpResponse  # Added for file response
+import itertools
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from rest_framework import status
 from dotenv import load_dotenv
-import random
-import string
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 from events.models import Events
+from django.db import transaction
+from .utils import stage_image, discard_staged_images, sniff_content_type, parse_range_header, extract_file_id_from_url
+from .tasks import upload_currency_images_task
+from party_currency_backend.ids import create_with_unique_id
 
 # Load environment variables
 load_dotenv()
@@ -33,49 +34,27 @@ class AnonThrottle(AnonRateThrottle):
     scope = 'anon'
 
 
-def generate_currency_id():
-    """Generate a unique currency ID"""
-    id = 'CUR' + ''.join(random.choices(string.ascii_letters + string.digits, k=5))
-    if Currency.objects.filter(currency_id=id).exists():
-        return generate_currency_id()
-    return id
+IMAGE_TYPES = ("front_image", "back_image")
 
 
-def upload_image(image_file, currency_id, image_type):
-    """Helper function to upload images to Google Drive"""
-    file_path = None
+def stage_images(request, currency_id):
+    """Stage the front/back images of a request, returning {image field: staging path}"""
+    staged = {}
     try:
-        file_name = f"{currency_id}_{image_type}{os.path.splitext(image_file.name)[1]}"
-        file_path = default_storage.save(f'tmp/{file_name}', ContentFile(image_file.read()))
-        
-        # Upload the file to Google Drive
-        folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
-        file_id = upload_file_to_drive(file_path, file_name, folder_id)
-        
-        # Clean up the temporary file
-        if file_path and default_storage.exists(file_path):
-            default_storage.delete(file_path)
-        
-        return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
-    except Exception as e:
-        # Clean up the temporary file in case of error
-        if file_path and default_storage.exists(file_path):
-            default_storage.delete(file_path)
-        raise e
+        for image_type in IMAGE_TYPES:
+            image_file = request.data.get(image_type)
+            if image_file:
+                staged[image_type] = stage_image(image_file, currency_id, image_type)
+    except Exception:
+        discard_staged_images(staged.values())
+        raise
+    return staged
 
 
-def extract_file_id_from_url(drive_url):
-    """Extract file ID from Google Drive URL"""
-    if not drive_url:
-        return None
-    
-    # Pattern to match Google Drive file URLs
-    pattern = r'https://drive\.google\.com/file/d/([^/]+)'
-    match = re.search(pattern, drive_url)
-    
-    if match:
-        return match.group(1)
-    return None
+def queue_image_upload(currency_id, staged):
+    """Hand staged images to the upload worker once the currency row is committed"""
+    if staged:
+        transaction.on_commit(lambda: upload_currency_images_task.delay(currency_id, staged))
 
 
 @api_view(["POST"])
@@ -83,7 +62,6 @@ def extract_file_id_from_url(drive_url):
 @permission_classes([IsAuthenticated])
 def save_currency(request):
     user = request.user
-    currency_id = generate_currency_id()
     currency_name = request.data.get("currency_name")
     currency_author = user.username
     event_id = request.data.get("event_id", "no_event")
@@ -91,43 +69,39 @@ def save_currency(request):
     back_celebration_text = request.data.get("back_celebration_text")
     # Get denomination from request data
     denomination = request.data.get("denomination")
-    
-    front_image_url = None
-    back_image_url = None
-    
-    # Process front image if provided
-    front_image = request.data.get("front_image")
-    if front_image:
-        try:
-            front_image_url = upload_image(front_image, currency_id, "front_image")
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    # Process back image if provided
-    back_image = request.data.get("back_image")
-    if back_image:
-        try:
-            back_image_url = upload_image(back_image, currency_id, "back_image")
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    has_images = any(request.data.get(image_type) for image_type in IMAGE_TYPES)
+
+    try:
+        event = Events.objects.get(event_id=event_id)
+    except Events.DoesNotExist:
+        return Response({"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Create currency object
-    currency = Currency.objects.create(
-        currency_id=currency_id,
+    # Create currency object; its ID is assigned on insert
+    currency = create_with_unique_id(
+        Currency,
+        'CUR',
         currency_name=currency_name,
         currency_author=currency_author,
         event_id=event_id,
         front_celebration_text=front_celebration_text,
-        front_image=front_image_url,
-        back_image=back_image_url,
         back_celebration_text=back_celebration_text,
-        denomination=denomination  # Added denomination field
+        denomination=denomination,  # Added denomination field
+        image_status="pending" if has_images else "ready"
     )
-    event = Events.objects.get(event_id=event_id)
+    currency_id = currency.currency_id
+
+    # Stage front/back images; a Celery worker uploads them to Drive afterwards
+    try:
+        staged = stage_images(request, currency_id)
+    except Exception as e:
+        currency.delete()
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     event.currency_id=currency_id
-    currency.save()
-   
-    return Response({"message": "Currency saved successfully","currency_id":currency_id,"event":event.event_name}, status=status.HTTP_200_OK)
+    # Queued last: outside a transaction the worker may start right away, and
+    # nothing here may write the currency row after it does
+    queue_image_upload(currency_id, staged)
+
+    return Response({"message": "Currency saved successfully","currency_id":currency_id,"event":event.event_name,"image_status":currency.image_status}, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
@@ -177,58 +151,79 @@ def download_image_from_drive(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Create temporary directory if it doesn't exist
-    tmp_dir = os.path.join(default_storage.location, 'tmp')
-    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        metadata = drive_cache.get_metadata(file_id)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    # Generate a temporary file path
-    temp_file_path = os.path.join(tmp_dir, f"temp_download_{file_id}")
+    size = int(metadata.get("size", 0))
+    etag = f'"{metadata.get("md5Checksum") or metadata.get("modifiedTime") or file_id}"'
     
-    try:
-        # Download the file from Google Drive
-        file_path = download_file_from_drive(file_id, temp_file_path)
-        
-        # Determine the file extension and MIME type
-        with open(file_path, 'rb') as f:
-            # Read first few bytes to determine file type
-            header = f.read(8)
-            f.seek(0)  # Reset file pointer
-            
-            # Get file content
-            file_content = f.read()
-        
-        # Clean up the temporary file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Determine content type based on file header
-        content_type = "application/octet-stream"  # Default
-        if header.startswith(b'\xFF\xD8'):
-            content_type = "image/jpeg"
-            extension = ".jpg"
-        elif header.startswith(b'\x89PNG'):
-            content_type = "image/png"
-            extension = ".png"
-        elif header.startswith(b'GIF87a') or header.startswith(b'GIF89a'):
-            content_type = "image/gif"
-            extension = ".gif"
-        elif header.startswith(b'%PDF'):
-            content_type = "application/pdf"
-            extension = ".pdf"
-        else:
-            extension = ""
-        
-        # Create the response with the file content
-        response = HttpResponse(file_content, content_type=content_type)
+    # Let the client reuse its copy if the file has not changed
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+    
+    # Serve a byte range if asked for, unless If-Range says the client's copy is stale
+    byte_range = None
+    if request.META.get("HTTP_IF_RANGE", etag) == etag:
+        try:
+            byte_range = parse_range_header(request.META.get("HTTP_RANGE"), size)
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    start, end = byte_range or (0, size - 1)
+    
+    # Serve whole files from the local cache with FileResponse so the server can sendfile them
+    cached_path = drive_cache.lookup(metadata) if size else None
+    if cached_path is not None and not byte_range:
+        cached_file = open(cached_path, "rb")
+        content_type, extension = sniff_content_type(cached_file.read(16))
+        cached_file.seek(0)
+        response = FileResponse(cached_file, content_type=content_type)
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
         response['Content-Disposition'] = f'attachment; filename="{custom_filename}{extension}"'
-        
         return response
-        
+    
+    try:
+        if cached_path is not None:
+            chunks = drive_cache.iter_range(cached_path, start, end)
+        elif size:
+            chunks = iter_file_chunks(metadata["id"], start, end)
+            if not byte_range:
+                # Fill the local cache while streaming a full download
+                chunks = drive_cache.tee(metadata, chunks)
+        else:
+            chunks = iter(())
+        # Fetch the first chunk eagerly so Drive errors still produce a JSON error
+        first_chunk = next(chunks, b"")
     except Exception as e:
-        # Clean up in case of error
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    # Determine content type based on file header
+    if start == 0:
+        content_type, extension = sniff_content_type(first_chunk)
+    else:
+        content_type = metadata.get("mimeType") or "application/octet-stream"
+        extension = os.path.splitext(metadata.get("name", ""))[1]
+    
+    response = StreamingHttpResponse(
+        itertools.chain([first_chunk], chunks),
+        content_type=content_type,
+        status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+    )
+    response["Content-Length"] = str(end - start + 1)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response['Content-Disposition'] = f'attachment; filename="{custom_filename}{extension}"'
+    
+    return response
 
 
 
@@ -249,23 +244,13 @@ def update_currency(request, id):
     if not data.get("event_id"):
         data["event_id"] = "no_event"
     
-    # Process front image if provided
-    front_image = request.data.get("front_image")
-    if front_image:
-        try:
-            front_image_url = upload_image(front_image, currency.currency_id, "front_image")
-            data["front_image"] = front_image_url
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    # Process back image if provided
-    back_image = request.data.get("back_image")
-    if back_image:
-        try:
-            back_image_url = upload_image(back_image, currency.currency_id, "back_image")
-            data["back_image"] = back_image_url
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    # Stage new front/back images; the current ones stay until the worker replaces them
+    try:
+        staged = stage_images(request, currency.currency_id)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    data.pop("front_image", None)
+    data.pop("back_image", None)
     
     # Handle denomination update
     if "denomination" in data:
@@ -280,11 +265,38 @@ def update_currency(request, id):
     # Update the currency
     serializer = CurrencySerializer(currency, data=data)
     if serializer.is_valid():
-        serializer.save()
+        # Only the fields sent are written: the image fields belong to the upload
+        # worker, which may have patched the row since it was read above
+        fields = dict(serializer.validated_data)
+        if staged:
+            fields["image_status"] = "pending"
+        for name, value in fields.items():
+            setattr(currency, name, value)
+        currency.save(update_fields=[*fields, "updated_at"])
+        queue_image_upload(currency.currency_id, staged)
         return Response(serializer.data, status=status.HTTP_200_OK)
+    discard_staged_images(staged.values())
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["GET"])
+@throttle_classes([AnonThrottle])
+@permission_classes([IsAuthenticated])
+def get_image_status(request, id):
+    try:
+        currency = Currency.objects.only(
+            "currency_id", "image_status", "front_image", "back_image"
+        ).get(currency_id=id)
+    except Currency.DoesNotExist:
+        return Response({"error": "Currency not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        "currency_id": currency.currency_id,
+        "image_status": currency.image_status,
+        "front_image": currency.front_image,
+        "back_image": currency.back_image
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(["DELETE"])
 @throttle_classes([UserThrottle])
 @permission_classes([IsAuthenticated])
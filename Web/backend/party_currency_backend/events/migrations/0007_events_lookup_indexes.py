@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so the tables stay writable during deploys
+    atomic = False
+
+    dependencies = [
+        ('events', '0006_alter_events_delivery_status'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='events',
+            index=models.Index(fields=['-created_at'], name='events_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='events',
+            index=models.Index(fields=['event_author', '-created_at'], name='events_author_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='events',
+            index=models.Index(fields=['delivery_status', '-created_at'], name='events_delivery_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='events',
+            index=models.Index(condition=models.Q(('has_reserved_account', True)), fields=['end_date'], name='events_reserved_end_date_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_events_lookup_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='events',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('event_name', 'event_id', 'event_author', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('city', 'state', 'street_address', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), '||', django.contrib.postgres.search.SearchVector('event_description', 'delivery_status', config='simple', weight='C'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='events',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='events_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='events',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['event_name'], name='events_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from datetime import date
 
 class Events(models.Model):
@@ -40,8 +42,36 @@ class Events(models.Model):
         ]
     )
 
+    # Full-text document for the admin search, kept up to date by PostgreSQL
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('event_name', 'event_id', 'event_author', weight='A', config='simple')
+            + SearchVector('city', 'state', 'street_address', weight='B', config='simple')
+            + SearchVector('event_description', 'delivery_status', weight='C', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     def __str__(self):
         return f"{self.event_name} - {self.event_id}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # Admin listings, newest first
+            models.Index(fields=['-created_at'], name='events_created_idx'),
+            # A user's events (EventList)
+            models.Index(fields=['event_author', '-created_at'], name='events_author_created_idx'),
+            # Admin pending-delivery listing
+            models.Index(fields=['delivery_status', '-created_at'], name='events_delivery_created_idx'),
+            # Daily reserved account cleanup: only the few events still holding an account
+            models.Index(
+                fields=['end_date'],
+                condition=models.Q(has_reserved_account=True),
+                name='events_reserved_end_date_idx',
+            ),
+            # Admin search: full text plus fuzzy matching on the name
+            GinIndex(fields=['search_vector'], name='events_search_vector_idx'),
+            GinIndex(fields=['event_name'], opclasses=['gin_trgm_ops'], name='events_name_trgm_idx'),
+        ]
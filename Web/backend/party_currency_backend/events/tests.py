@@ -1,3 +1,97 @@
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from party_currency_backend import ids
+from party_currency_backend.ids import create_with_unique_id, random_id
+from party_currency_backend.testing import IndexPlanTestMixin
+from .models import Events
 
 # Create your tests here.
+
+
+@skipUnless(connection.vendor == 'postgresql', "EXPLAIN plans are PostgreSQL specific")
+class EventIndexTests(IndexPlanTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Few events are pending delivery or hold a reserved account, as in production
+        today = date.today()
+        Events.objects.bulk_create([
+            Events(
+                event_id=f"EVT{i:05d}",
+                event_name=f"Event {i}",
+                event_author=f"user{i % 300}",
+                start_date=today - timedelta(days=i % 30),
+                end_date=today - timedelta(days=i % 30 - 3),
+                delivery_address="Lagos",
+                delivery_status='pending' if i % 20 == 0 else ('delivered', 'pending payment')[i % 2],
+                has_reserved_account=i % 20 == 0,
+            )
+            for i in range(3000)
+        ])
+        cls.analyze(Events)
+
+    def test_events_of_author(self):
+        self.assertUsesIndex(Events.objects.filter(event_author="user7"), "events_author_created_idx")
+
+    def test_pending_delivery_events(self):
+        self.assertUsesIndex(
+            Events.objects.filter(delivery_status='pending').order_by('-created_at'),
+            "events_delivery_created_idx",
+        )
+
+    def test_concluded_events_with_reserved_account(self):
+        self.assertUsesIndex(
+            Events.objects.filter(end_date__lt=date.today(), has_reserved_account=True),
+            "events_reserved_end_date_idx",
+        )
+
+
+class EventIdTests(TestCase):
+    def create_event(self, **fields):
+        fields.setdefault('end_date', date.today())
+        return create_with_unique_id(
+            Events, 'EVT', event_name="Party", start_date=date.today(), delivery_address="Lagos", **fields
+        )
+
+    def test_single_insert_without_precheck(self):
+        # SAVEPOINT, INSERT, RELEASE SAVEPOINT
+        with self.assertNumQueries(3):
+            event = self.create_event()
+        self.assertRegex(event.event_id, r"^EVT[A-Za-z0-9]{5}$")
+
+    def test_retries_on_collision(self):
+        taken = self.create_event().event_id
+        with mock.patch.object(ids, 'random_id', side_effect=[taken, taken, "EVTfresh"]):
+            event = self.create_event()
+        self.assertEqual(event.event_id, "EVTfresh")
+        self.assertEqual(Events.objects.count(), 2)
+
+    def test_gives_up_after_max_attempts(self):
+        taken = self.create_event().event_id
+        with mock.patch.object(ids, 'random_id', return_value=taken) as generate:
+            with self.assertRaises(IntegrityError):
+                self.create_event()
+        self.assertEqual(generate.call_count, ids.MAX_ATTEMPTS)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        with mock.patch.object(ids, 'random_id', wraps=random_id) as generate:
+            with self.assertRaises(IntegrityError):
+                self.create_event(end_date=None)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_collision_rate_at_10m_rows(self):
+        # Same fill ratio as 10M of the 62**5 five character IDs, on 3 characters
+        keyspace = 62 ** 3
+        taken = set()
+        while len(taken) < keyspace * 10_000_000 // 62 ** 5:
+            taken.add(random_id('', 3))
+
+        draws = 20_000
+        attempts = 0
+        for _ in range(draws):
+            attempts += 1
+            while random_id('', 3) in taken:
+                attempts += 1
+
+        self.assertLess(attempts / draws, 1.03)
@@ -14,19 +14,12 @@ from google_drive.utils import upload_file_to_drive
 from authentication.models import CustomUser
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
-import random
-import string
+from party_currency_backend.ids import create_with_unique_id
 from currencies.serializers import CurrencySerializer
 from payment.serializers import TransactionSerializer
 from payment.models import Transaction
 # Create your views here.
 
-def generate_short_event_id(username):
-    id = 'EVT' + ''.join(random.choices(string.ascii_letters + string.digits, k=5))
-    if Events.objects.filter(event_id=id).exists():
-        return generate_short_event_id(username)
-    return id
-    
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def EventCreate(request):
@@ -69,7 +62,9 @@ def EventCreate(request):
             )
         
         # Create event with shorter ID
-        event = Events.objects.create(
+        event = create_with_unique_id(
+            Events,
+            'EVT',
             event_name=request.data["event_name"],
             event_description=request.data["event_type"],
             event_author=request.user.username,
@@ -80,7 +75,6 @@ def EventCreate(request):
             LGA=request.data["LGA"],
             state=request.data["state"],
             postal_code=request.data["postal_code"],
-            event_id=generate_short_event_id(request.user.username),
             created_at=current_time,
             reconciliation=request.data["reconciliation_service"],
         )
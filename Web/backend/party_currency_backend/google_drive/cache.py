@@ -0,0 +1,146 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils import get_file_metadata, iter_file_chunks, DRIVE_DOWNLOAD_CHUNK_SIZE
+
+logger = logging.getLogger("google_drive_cache")
+
+
+class DriveFileCache:
+    """
+    Local on-disk LRU cache of Google Drive files.
+
+    Entries are content-addressed by the Drive file ID plus its `md5Checksum` and
+    `modifiedTime`, so a changed file simply gets a new entry and stale ones age
+    out. Hits refresh the entry's mtime, and the least recently used entries are
+    evicted once the cache grows past its byte budget. Drive metadata is kept in
+    the Django cache for `metadata_ttl` seconds so repeat hits don't need to ask
+    Drive whether the file changed.
+    """
+    METADATA_PREFIX = "drive_meta_"
+
+    def __init__(self, root=None, max_bytes=None, metadata_ttl=None):
+        self.root = Path(root or settings.DRIVE_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.DRIVE_CACHE_MAX_BYTES
+        self.metadata_ttl = metadata_ttl if metadata_ttl is not None else settings.DRIVE_CACHE_METADATA_TTL
+        self._evict_lock = threading.Lock()
+
+    def get_metadata(self, file_id: str) -> Dict[str, Any]:
+        """Return the Drive metadata of a file, from the Django cache when possible"""
+        cache_key = f"{self.METADATA_PREFIX}{file_id}"
+        metadata = cache.get(cache_key)
+        if metadata is None:
+            metadata = get_file_metadata(file_id)
+            cache.set(cache_key, metadata, timeout=self.metadata_ttl)
+        return metadata
+
+    def path_for(self, metadata: Dict[str, Any]) -> Path:
+        """Location of the cache entry for a given version of a file"""
+        version = f"{metadata['id']}:{metadata.get('md5Checksum', '')}:{metadata.get('modifiedTime', '')}"
+        key = hashlib.sha256(version.encode()).hexdigest()
+        return self.root / key[:2] / key
+
+    def lookup(self, metadata: Dict[str, Any]) -> Optional[Path]:
+        """Return the cached copy of a file version, marking it as recently used"""
+        path = self.path_for(metadata)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def iter_range(self, path: Path, start: int, end: int, chunk_size: int = DRIVE_DOWNLOAD_CHUNK_SIZE):
+        """Yield the inclusive byte range `start`-`end` of a cached file"""
+        with open(path, "rb") as cached_file:
+            cached_file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = cached_file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def fetch(self, file_id: str) -> Optional[Path]:
+        """
+        Return the path of a cached copy of a file, downloading it on a miss.
+        Returns None for files too large to cache.
+        """
+        metadata = self.get_metadata(file_id)
+        path = self.lookup(metadata)
+        if path is not None or not self.is_cacheable(metadata):
+            return path
+        for _ in self.tee(metadata, iter_file_chunks(file_id)):
+            pass
+        return self.lookup(metadata)
+
+    def is_cacheable(self, metadata: Dict[str, Any]) -> bool:
+        return 0 < int(metadata.get('size', 0)) <= self.max_bytes
+
+    def tee(self, metadata: Dict[str, Any], chunks):
+        """
+        Pass `chunks` through while writing them to the cache.
+
+        The entry only appears once every chunk has been written; an interrupted or
+        failed download leaves nothing behind.
+        """
+        if not self.is_cacheable(metadata):
+            yield from chunks
+            return
+
+        path = self.path_for(metadata)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".partial-")
+        committed = False
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in chunks:
+                    temp_file.write(chunk)
+                    yield chunk
+            os.replace(temp_path, path)
+            committed = True
+        finally:
+            if not committed and os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its byte budget"""
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            total = 0
+            for path in self.root.glob("*/*"):
+                if path.name.startswith(".partial-"):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                    logger.debug(f"Evicted {path.name} ({size} bytes)")
+                except FileNotFoundError:
+                    pass
+        finally:
+            self._evict_lock.release()
+
+
+drive_cache = DriveFileCache()
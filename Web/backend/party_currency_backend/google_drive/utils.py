@@ -1,12 +1,18 @@
 import os
 import io
+import mimetypes
+import threading
 from typing import Optional, Union, Dict, Any
 from pathlib import Path
 import logging
 
+import httplib2
 from google.oauth2 import service_account
+from google.auth.transport.requests import Request, AuthorizedSession
+from requests.adapters import HTTPAdapter
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload, MediaIoBaseDownload
 import json
 from dotenv import load_dotenv
 
@@ -24,6 +30,27 @@ load_dotenv()
 # Consider using more specific scopes if you don't need full access
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
+# Socket timeout (seconds) for the pooled Drive HTTP connections
+DRIVE_HTTP_TIMEOUT = 60
+
+# Resumable upload chunk size; must be a multiple of 256 KiB. Bounds the memory
+# held per upload while keeping typical currency images to one or two requests.
+DRIVE_UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+
+# Bytes read from the Drive response per chunk when streaming a download
+DRIVE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Fields fetched by get_file_metadata()
+FILE_METADATA_FIELDS = 'id, name, mimeType, size, md5Checksum, modifiedTime'
+
+# Process-wide credentials plus one built service per thread (httplib2 is not
+# thread-safe, so each thread gets its own authorized connection)
+_credentials = None
+_credentials_lock = threading.Lock()
+_service_local = threading.local()
+_session = None
+_cache_pid = os.getpid()
+
 def get_service_account_info() -> Dict[str, Any]:
     """
     Load the service account information from environment variable.
@@ -64,17 +91,79 @@ def authenticate():
         logger.error(f"Authentication failed: {e}")
         raise
 
+def reset_drive_service():
+    """
+    Forget the cached credentials and Drive services.
+
+    Runs automatically in forked children (gunicorn/Celery prefork) so they never
+    reuse the parent's sockets or locks.
+    """
+    global _credentials, _credentials_lock, _service_local, _session, _cache_pid
+    _credentials = None
+    _credentials_lock = threading.Lock()
+    _service_local = threading.local()
+    _session = None
+    _cache_pid = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_drive_service)
+
+
+def get_credentials():
+    """
+    Return the process-wide service account credentials, refreshing the access
+    token only when it has expired.
+
+    Returns:
+        google.oauth2.service_account.Credentials: Valid credentials
+    """
+    global _credentials
+    if _cache_pid != os.getpid():
+        reset_drive_service()
+
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials = authenticate()
+        if not _credentials.valid:
+            _credentials.refresh(Request())
+            logger.info("Refreshed Google Drive access token")
+        return _credentials
+
+
 def get_drive_service():
     """
-    Build and return a Google Drive service object.
-    
+    Return the cached Google Drive service object for the current thread,
+    building it on first use.
+
     Returns:
         googleapiclient.discovery.Resource: The Drive service object
     """
-    creds = authenticate()
-    service = build('drive', 'v3', credentials=creds)
+    creds = get_credentials()
+    service = getattr(_service_local, 'service', None)
+    if service is None:
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=DRIVE_HTTP_TIMEOUT))
+        service = build('drive', 'v3', http=http, cache_discovery=True)
+        _service_local.service = service
     return service
 
+
+def get_authorized_session():
+    """
+    Return the process-wide pooled `AuthorizedSession` used for streamed downloads.
+
+    Unlike the httplib2 transport behind the service object, a requests session can
+    stream a response body and is safe to share between threads.
+    """
+    global _session
+    creds = get_credentials()
+    with _credentials_lock:
+        if _session is None:
+            _session = AuthorizedSession(creds)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+            _session.mount('https://', adapter)
+        return _session
+
 def upload_file_to_drive(
     file_path: Union[str, Path], 
     file_name: Optional[str] = None, 
@@ -109,46 +198,89 @@ def upload_file_to_drive(
         file_name = file_path.name
     
     try:
-        service = get_drive_service()
-        
-        file_metadata = {
-            'name': file_name,
-        }
-        
-        # Add folder if specified
-        if folder_id:
-            file_metadata['parents'] = [folder_id]
-        
-        media = MediaFileUpload(
-            str(file_path), 
-            mimetype=mime_type, 
-            resumable=True
+        return _upload_media(
+            file_name,
+            folder_id,
+            lambda: MediaFileUpload(str(file_path), mimetype=mime_type, resumable=True)
         )
+    except Exception as e:
+        logger.error(f"Error uploading file: {e}")
+        raise
+
+def upload_fileobj_to_drive(
+    file_obj,
+    file_name: str,
+    folder_id: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    chunk_size: int = DRIVE_UPLOAD_CHUNK_SIZE
+) -> str:
+    """
+    Stream a file-like object (e.g. a Django UploadedFile) to Google Drive.
+    
+    The object is read DRIVE_UPLOAD_CHUNK_SIZE bytes at a time through a resumable
+    upload, so nothing is written to disk and memory stays flat for large files.
+    
+    Args:
+        file_obj: Seekable binary file-like object to upload
+        file_name (str): Name to give the file in Drive
+        folder_id (Optional[str]): ID of the folder to upload to (if None, uploads to root)
+        mime_type (Optional[str]): MIME type of the file (if None, uses the upload's
+                                   content type or guesses from the file name)
+        chunk_size (int): Bytes sent per resumable upload request
         
-        # Upload with retry (3 attempts)
-        retry_count = 0
-        max_retries = 3
-        while retry_count < max_retries:
-            try:
-                logger.info(f"Uploading file: {file_name} (Attempt {retry_count + 1}/{max_retries})")
-                file = service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                ).execute()
-                file_id = file.get('id')
-                logger.info(f"File uploaded successfully. File ID: {file_id}")
-                return file_id
-            except Exception as e:
-                retry_count += 1
-                if retry_count >= max_retries:
-                    raise
-                logger.warning(f"Upload attempt {retry_count} failed: {e}. Retrying...")
-        
+    Returns:
+        str: The ID of the uploaded file
+    """
+    if mime_type is None:
+        mime_type = (
+            getattr(file_obj, 'content_type', None)
+            or mimetypes.guess_type(file_name)[0]
+            or 'application/octet-stream'
+        )
+    
+    def make_media():
+        # Every attempt starts again from the beginning of the stream
+        file_obj.seek(0)
+        return MediaIoBaseUpload(file_obj, mimetype=mime_type, chunksize=chunk_size, resumable=True)
+    
+    try:
+        return _upload_media(file_name, folder_id, make_media)
     except Exception as e:
         logger.error(f"Error uploading file: {e}")
         raise
 
+def _upload_media(file_name: str, folder_id: Optional[str], make_media) -> str:
+    """Create a Drive file from `make_media()`, retrying up to 3 times"""
+    service = get_drive_service()
+    
+    file_metadata = {
+        'name': file_name,
+    }
+    
+    # Add folder if specified
+    if folder_id:
+        file_metadata['parents'] = [folder_id]
+    
+    # Upload with retry (3 attempts)
+    retry_count = 0
+    max_retries = 3
+    while retry_count < max_retries:
+        try:
+            logger.info(f"Uploading file: {file_name} (Attempt {retry_count + 1}/{max_retries})")
+            file = service.files().create(
+                body=file_metadata,
+                media_body=make_media(),
+                fields='id'
+            ).execute()
+            file_id = file.get('id')
+            logger.info(f"File uploaded successfully. File ID: {file_id}")
+            return file_id
+        except Exception as e:
+            retry_count += 1
+            if retry_count >= max_retries:
+                raise
+            logger.warning(f"Upload attempt {retry_count} failed: {e}. Retrying...")
+
 def download_file_from_drive(
     file_id: str, 
     destination_path: Optional[Union[str, Path]] = None
@@ -181,11 +313,11 @@ def download_file_from_drive(
         file_content = io.BytesIO()
         downloader = MediaIoBaseDownload(file_content, request)
         
-        # Download the file with progress reporting
+        # Download the file
         done = False
         while not done:
             status, done = downloader.next_chunk()
-            logger.info(f"Download progress: {int(status.progress() * 100)}%")
+            logger.debug(f"Download progress: {int(status.progress() * 100)}%")
         
         # Reset the file pointer to the beginning
         file_content.seek(0)
@@ -216,6 +348,53 @@ def download_file_from_drive(
         logger.error(f"Error downloading file: {e}")
         raise
 
+def get_file_metadata(file_id: str) -> Dict[str, Any]:
+    """
+    Fetch the metadata of a Drive file.
+    
+    Args:
+        file_id (str): The ID of the file
+        
+    Returns:
+        Dict[str, Any]: The FILE_METADATA_FIELDS of the file
+    """
+    return get_drive_service().files().get(fileId=file_id, fields=FILE_METADATA_FIELDS).execute()
+
+def iter_file_chunks(
+    file_id: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_size: int = DRIVE_DOWNLOAD_CHUNK_SIZE
+):
+    """
+    Stream the content of a Drive file, or an inclusive byte range of it.
+    
+    The file is fetched with a single streamed request, so only one chunk is held
+    in memory at a time. Errors from Drive are raised on the first iteration.
+    
+    Args:
+        file_id (str): The ID of the file to download
+        start (int): First byte to return
+        end (Optional[int]): Last byte to return (if None, reads to the end)
+        chunk_size (int): Size of the chunks yielded
+        
+    Yields:
+        bytes: Consecutive chunks of the file
+    """
+    url = get_drive_service().files().get_media(fileId=file_id).uri
+    headers = {}
+    if start or end is not None:
+        headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+    
+    response = get_authorized_session().get(url, headers=headers, stream=True, timeout=DRIVE_HTTP_TIMEOUT)
+    try:
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
 def list_files_in_drive(
     folder_id: Optional[str] = None,
     query: Optional[str] = None,
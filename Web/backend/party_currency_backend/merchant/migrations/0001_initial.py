@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservedAccountSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_reference', models.CharField(max_length=255, unique=True)),
+                ('last_completed_on', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReservedAccountTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_reference', models.CharField(max_length=255)),
+                ('transaction_reference', models.CharField(max_length=255, unique=True)),
+                ('payment_reference', models.CharField(blank=True, max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('currency_code', models.CharField(default='NGN', max_length=3)),
+                ('payment_status', models.CharField(max_length=50)),
+                ('payment_method', models.CharField(blank=True, max_length=50)),
+                ('payment_description', models.TextField(blank=True)),
+                ('completed_on', models.DateTimeField()),
+                ('raw', models.JSONField(default=dict)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-completed_on'],
+                'indexes': [models.Index(fields=['account_reference', '-completed_on'], name='reserved_txn_account_idx')],
+            },
+        ),
+    ]
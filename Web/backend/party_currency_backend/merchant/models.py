@@ -1,3 +1,44 @@
 from django.db import models
 
 # Create your models here.
+
+
+class ReservedAccountTransaction(models.Model):
+    """
+    Local copy of a transfer into a Monnify reserved account, kept current by
+    the sync task and by reserved account webhooks.
+    """
+    account_reference = models.CharField(max_length=255)
+    transaction_reference = models.CharField(max_length=255, unique=True)
+    payment_reference = models.CharField(max_length=255, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    currency_code = models.CharField(max_length=3, default='NGN')
+    payment_status = models.CharField(max_length=50)
+    payment_method = models.CharField(max_length=50, blank=True)
+    payment_description = models.TextField(blank=True)
+    completed_on = models.DateTimeField()
+    raw = models.JSONField(default=dict)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-completed_on']
+        indexes = [
+            models.Index(fields=['account_reference', '-completed_on'], name='reserved_txn_account_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_reference} - {self.transaction_reference}"
+
+
+class ReservedAccountSyncState(models.Model):
+    """
+    Per account high-water mark of the sync: transactions completed up to
+    `last_completed_on` are already stored, so a sync only pulls newer ones.
+    """
+    account_reference = models.CharField(max_length=255, unique=True)
+    last_completed_on = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.account_reference} synced at {self.last_synced_at}"
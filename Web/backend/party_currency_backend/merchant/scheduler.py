@@ -1,38 +1,83 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
 from django.utils import timezone
+from authentication.backends import invalidate_user_tokens
+from authentication.models import CustomUser
 from events.models import Events
-from .views import deleteReservedAccount
-import requests
-import os
-from datetime import datetime, timedelta
-from payment.utils import MonnifyAuth
+from payment.client import TokenBucket
+from .utils import delete_reserved_account, mark_reserved_accounts_deleted
+
+logger = logging.getLogger(__name__)
+
+# Concurrent deletions in flight, and the overall rate they are sent to Monnify at
+CLEANUP_WORKERS = int(os.getenv('RESERVED_ACCOUNT_CLEANUP_WORKERS', 8))
+CLEANUP_RATE = float(os.getenv('RESERVED_ACCOUNT_CLEANUP_RATE', 5))
+
+# Events handled per batch; each batch ends with one UPDATE for its successes
+CLEANUP_BATCH_SIZE = 500
+
+# Held for the whole run, so overlapping beat runs don't delete the same accounts
+CLEANUP_LOCK_KEY = 'reserved_account_cleanup_lock'
+CLEANUP_LOCK_TIMEOUT = 6 * 60 * 60
+
+
+def _delete_account(bucket, account_reference):
+    """Delete one account, returning its outcome instead of raising"""
+    bucket.acquire()
+    try:
+        deleted, _ = delete_reserved_account(account_reference)
+        return 'deleted' if deleted else 'already_deleted'
+    except Exception as e:
+        logger.error(f"Error deleting reserved account for event {account_reference}: {str(e)}")
+        return 'failed'
+
+
+def _mark_deleted(event_ids):
+    mark_reserved_accounts_deleted(event_ids)
+    user_ids = list(CustomUser.objects.filter(virtual_account_reference__in=event_ids).values_list('pk', flat=True))
+    if user_ids:
+        CustomUser.objects.filter(pk__in=user_ids).update(virtual_account_reference=None)
+        invalidate_user_tokens(user_ids)
+
 
 def check_and_delete_reserved_accounts():
     """
     Daily scheduler to check for concluded events and delete their reserved accounts.
     This function should be called by a task scheduler (e.g., Celery, Django-Q, or cron).
+
+    Deletions run on a bounded thread pool behind a shared rate limit. Each
+    batch's successes are flipped with a single UPDATE; failed events keep
+    their account and are retried on the next run.
+
+    Returns:
+        dict: number of events per outcome, or None if another run holds the lock
     """
-    today = timezone.now().date()
-    
-    # Get all events that have ended and have a reserved account
-    concluded_events = Events.objects.filter(
-        end_date__lt=today,
-        has_reserved_account=True
-    )
-    
-    for event in concluded_events:
-        try:
-            # Call the deleteReservedAccount function
-            response = deleteReservedAccount(None, account_reference=event.event_id)
-            
-            # If the deletion was successful, update the event
-            if response.status_code == 200:
-                event.has_reserved_account = False
-                event.save()
-                print(f"Successfully deleted reserved account for event {event.event_id}")
-            else:
-                print(f"Failed to delete reserved account for event {event.event_id}: {response.data}")
-                
-        except Exception as e:
-            print(f"Error deleting reserved account for event {event.event_id}: {str(e)}")
-            
-    print(f"Completed checking {concluded_events.count()} concluded events for reserved account deletion") 
\ No newline at end of file
+    if not cache.add(CLEANUP_LOCK_KEY, 1, timeout=CLEANUP_LOCK_TIMEOUT):
+        logger.warning("Reserved account cleanup already running, skipping")
+        return None
+
+    try:
+        today = timezone.now().date()
+
+        # Get all events that have ended and have a reserved account
+        event_ids = list(Events.objects.filter(
+            end_date__lt=today,
+            has_reserved_account=True
+        ).values_list('event_id', flat=True))
+
+        bucket = TokenBucket(CLEANUP_RATE)
+        summary = {'deleted': 0, 'already_deleted': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as pool:
+            for start in range(0, len(event_ids), CLEANUP_BATCH_SIZE):
+                batch = event_ids[start:start + CLEANUP_BATCH_SIZE]
+                outcomes = dict(zip(batch, pool.map(lambda event_id: _delete_account(bucket, event_id), batch)))
+                _mark_deleted([event_id for event_id, outcome in outcomes.items() if outcome != 'failed'])
+                for outcome in outcomes.values():
+                    summary[outcome] += 1
+
+        logger.info(f"Completed checking {len(event_ids)} concluded events for reserved account deletion: {summary}")
+        return summary
+    finally:
+        cache.delete(CLEANUP_LOCK_KEY)
@@ -1,5 +1,6 @@
 from celery import shared_task
 from .scheduler import check_and_delete_reserved_accounts
+from .utils import live_reserved_accounts, sync_reserved_account
 
 @shared_task
 def check_and_delete_reserved_accounts_task():
@@ -7,4 +8,28 @@ def check_and_delete_reserved_accounts_task():
     Celery task that runs the check_and_delete_reserved_accounts function.
     This task is scheduled to run daily at midnight.
     """
-    check_and_delete_reserved_accounts() 
\ No newline at end of file
+    return check_and_delete_reserved_accounts()
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def sync_reserved_account_task(self, account_reference):
+    """
+    Pull new transactions for one reserved account into the local mirror.
+    Failed syncs are retried; the high-water mark only advances on success.
+    """
+    try:
+        return sync_reserved_account(account_reference)
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@shared_task
+def sync_all_reserved_accounts_task():
+    """
+    Queue a sync for every event that still has a reserved account.
+    Scheduled every few minutes.
+    """
+    references = list(live_reserved_accounts())
+    for account_reference in references:
+        sync_reserved_account_task.delay(account_reference)
+    return len(references)
@@ -1,3 +1,60 @@
+from datetime import date
+from unittest import mock
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from events.models import Events
+from .models import ReservedAccountSyncState
+from .scheduler import _mark_deleted
+from .tasks import sync_all_reserved_accounts_task
 
 # Create your tests here.
+
+
+class ReservedAccountSyncScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner@example.com", email="owner@example.com", password="password1")
+        cls.other = CustomUser.objects.create_user(username="other@example.com", email="other@example.com", password="password1")
+        for event_id, live in (("EVTLIVE", True), ("EVTGONE", False)):
+            Events.objects.create(
+                event_id=event_id,
+                event_name=event_id,
+                event_author=cls.owner.username,
+                start_date=date.today(),
+                end_date=date.today(),
+                delivery_address="Lagos",
+                has_reserved_account=live,
+            )
+        ReservedAccountSyncState.objects.create(account_reference="EVTGONE")
+
+    def test_only_live_accounts_are_synced(self):
+        with mock.patch('merchant.tasks.sync_reserved_account_task.delay') as delay:
+            self.assertEqual(sync_all_reserved_accounts_task(), 1)
+        delay.assert_called_once_with("EVTLIVE")
+
+    def test_deleted_accounts_stop_syncing(self):
+        ReservedAccountSyncState.objects.create(account_reference="EVTLIVE")
+        _mark_deleted(["EVTLIVE"])
+        self.assertFalse(Events.objects.get(event_id="EVTLIVE").has_reserved_account)
+        self.assertFalse(ReservedAccountSyncState.objects.filter(account_reference="EVTLIVE").exists())
+
+    def test_listing_someone_elses_account_is_refused(self):
+        client = APIClient()
+        client.force_authenticate(self.other)
+        with mock.patch('merchant.views.sync_reserved_account_task.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = client.get(reverse("list transactions"), {"account_reference": "EVTLIVE"})
+        self.assertEqual(response.status_code, 404)
+        delay.assert_not_called()
+
+    def test_listing_own_account_queues_sync(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        with mock.patch('merchant.views.sync_reserved_account_task.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = client.get(reverse("list transactions"), {"account_reference": "EVTLIVE", "count": "none"})
+            client.get(reverse("list transactions"), {"account_reference": "EVTGONE", "count": "none"})
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once_with("EVTLIVE")
@@ -0,0 +1,205 @@
+import logging
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from events.models import Events
+from payment.client import monnify_client
+from .models import ReservedAccountTransaction, ReservedAccountSyncState
+
+logger = logging.getLogger(__name__)
+
+# Transactions requested per Monnify page while syncing
+SYNC_PAGE_SIZE = 100
+
+# Hard stop for one sync run, so a misbehaving account can't loop forever
+SYNC_MAX_PAGES = 200
+
+# An account whose last sync is older than this is re-synced when it is viewed
+SYNC_STALE_AFTER = timedelta(minutes=5)
+
+# Only one sync per account at a time, across workers
+SYNC_LOCK_PREFIX = "reserved_account_sync_"
+SYNC_LOCK_TIMEOUT = 10 * 60
+
+UPSERT_FIELDS = [
+    'account_reference', 'payment_reference', 'amount', 'currency_code', 'payment_status',
+    'payment_method', 'payment_description', 'completed_on', 'raw',
+]
+
+
+def parse_monnify_datetime(value):
+    """Parse Monnify timestamps such as "2024-01-15 10:23:45.0" or "2024-01-15T10:23:45.000+0000\""""
+    if not value:
+        return None
+    value = str(value).strip().replace(' ', 'T', 1)
+    if len(value) > 5 and value[-5] in '+-' and value[-4:].isdigit():
+        value = f"{value[:-2]}:{value[-2:]}"
+    parsed = parse_datetime(value)
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def build_reserved_account_transaction(account_reference, data):
+    """
+    Map a transaction from the reserved account transactions API, or the
+    eventData of a reserved account webhook, onto an unsaved row.
+    """
+    try:
+        amount = Decimal(str(data.get('amount') or data.get('amountPaid') or 0))
+    except InvalidOperation:
+        amount = Decimal('0')
+    completed_on = (
+        parse_monnify_datetime(data.get('completedOn'))
+        or parse_monnify_datetime(data.get('paidOn'))
+        or timezone.now()
+    )
+    return ReservedAccountTransaction(
+        account_reference=account_reference,
+        transaction_reference=data['transactionReference'],
+        payment_reference=data.get('paymentReference') or '',
+        amount=amount,
+        currency_code=data.get('currencyCode') or data.get('currency') or 'NGN',
+        payment_status=data.get('paymentStatus') or '',
+        payment_method=data.get('paymentMethod') or '',
+        payment_description=data.get('paymentDescription') or '',
+        completed_on=completed_on,
+        raw=data,
+    )
+
+
+def upsert_reserved_account_transactions(rows):
+    """Insert new transactions and refresh known ones in one statement"""
+    if not rows:
+        return 0
+    ReservedAccountTransaction.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['transaction_reference'],
+        update_fields=UPSERT_FIELDS + ['synced_at'],
+    )
+    return len(rows)
+
+
+def fetch_reserved_account_page(account_reference, page):
+    response = monnify_client.get(
+        "/bank-transfer/reserved-accounts/transactions",
+        endpoint='reserved_account_transactions',
+        params={'accountReference': account_reference, 'page': page, 'size': SYNC_PAGE_SIZE},
+    ).json()
+    if not response.get("requestSuccessful", False):
+        raise ValueError(response.get("responseMessage", "Unknown error"))
+    return response.get("responseBody") or {}
+
+
+def sync_reserved_account(account_reference):
+    """
+    Pull transactions completed since the account's high-water mark.
+
+    Monnify lists newest first, so pages are read until one holds nothing newer
+    than the mark (or the list ends). The mark only moves forward once every new
+    page has been stored, so a failed run is simply repeated next time.
+
+    Returns:
+        int: number of transactions stored, or None if the account no longer
+        exists or another sync holds the lock
+    """
+    if not live_reserved_accounts().filter(event_id=account_reference).exists():
+        # Deleted since the sync was queued
+        return None
+
+    lock_key = f"{SYNC_LOCK_PREFIX}{account_reference}"
+    if not cache.add(lock_key, 1, timeout=SYNC_LOCK_TIMEOUT):
+        return None
+
+    try:
+        state, _ = ReservedAccountSyncState.objects.get_or_create(account_reference=account_reference)
+        watermark = state.last_completed_on
+        newest = watermark
+        stored = 0
+        try:
+            for page in range(SYNC_MAX_PAGES):
+                body = fetch_reserved_account_page(account_reference, page)
+                content = body.get("content") or []
+                rows = [
+                    build_reserved_account_transaction(account_reference, data)
+                    for data in content
+                    if data.get("transactionReference")
+                ]
+                new_rows = [row for row in rows if watermark is None or row.completed_on >= watermark]
+                stored += upsert_reserved_account_transactions(new_rows)
+                for row in new_rows:
+                    if newest is None or row.completed_on > newest:
+                        newest = row.completed_on
+
+                reached_mark = watermark is not None and any(row.completed_on <= watermark for row in rows)
+                if body.get("last", True) or not content or reached_mark:
+                    break
+            else:
+                logger.warning(f"Reserved account {account_reference} sync stopped after {SYNC_MAX_PAGES} pages")
+        except Exception as e:
+            ReservedAccountSyncState.objects.filter(pk=state.pk).update(last_error=str(e))
+            raise
+
+        ReservedAccountSyncState.objects.filter(pk=state.pk).update(
+            last_completed_on=newest, last_synced_at=timezone.now(), last_error=''
+        )
+        return stored
+    finally:
+        cache.delete(lock_key)
+
+
+def is_sync_stale(state):
+    return state is None or state.last_synced_at is None or timezone.now() - state.last_synced_at > SYNC_STALE_AFTER
+
+
+def delete_reserved_account(account_reference):
+    """
+    Delete a reserved account on Monnify.
+
+    An account Monnify no longer knows about counts as deleted, so retries and
+    overlapping cleanups are harmless.
+
+    Returns:
+        (deleted, data): deleted is False when the account was already gone
+    Raises:
+        requests.exceptions.RequestException: HTTPError for any other error response
+    """
+    response = monnify_client.delete(
+        f"/bank-transfer/reserved-accounts/reference/{account_reference}",
+        endpoint='delete_reserved_account'
+    )
+    logger.info(f"Monnify delete reserved account {account_reference}: {response.status_code}")
+
+    if response.status_code == 404:
+        return False, {"message": "Account already deleted or not found"}
+    if response.status_code == 400:
+        try:
+            detail = response.json().get('responseMessage', '')
+        except ValueError:
+            detail = response.text
+        if "does not exist" in detail.lower() or "not found" in detail.lower():
+            return False, {"message": "Account already deleted or not found", "detail": detail}
+
+    response.raise_for_status()
+    try:
+        return True, response.json()
+    except ValueError:
+        return True, {"message": "Account successfully deleted"}
+
+
+def mark_reserved_accounts_deleted(account_references):
+    """
+    Record that accounts are gone: their events no longer hold one and their
+    sync state is dropped, so they stop being synced. Mirrored transactions
+    are kept.
+    """
+    Events.objects.filter(event_id__in=account_references, has_reserved_account=True).update(has_reserved_account=False)
+    ReservedAccountSyncState.objects.filter(account_reference__in=account_references).delete()
+
+
+def live_reserved_accounts():
+    """References of the reserved accounts that still exist, one per event"""
+    return Events.objects.filter(has_reserved_account=True).values_list('event_id', flat=True)
@@ -1,11 +1,18 @@
 from django.shortcuts import render
-from payment.utils import MonnifyAuth
+from payment.client import monnify_client, MonnifyAuthError
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 from rest_framework import status
+from django.db import transaction
 from events.models import Events
+from party_currency_backend.pagination import get_page_size, paginate_cursor
+from party_currency_admin.utils import parse_date_range
+from .models import ReservedAccountTransaction, ReservedAccountSyncState
+from .tasks import sync_reserved_account_task
+from .utils import delete_reserved_account, is_sync_stale, mark_reserved_accounts_deleted
+from decimal import Decimal, InvalidOperation
 import requests
 import os
 import logging
@@ -20,68 +27,82 @@ class UserThrottle(UserRateThrottle):
 @permission_classes([IsAuthenticated])
 # @throttle_classes([UserThrottle])
 def getAllTransaction(request):
+    """
+    Transactions of one of the caller's reserved accounts, served from the
+    local mirror. Accounts that still exist are re-synced in the background.
+
+    Query Parameters:
+        account_reference: The reserved account to list (required)
+        status: Monnify payment status, e.g. PAID
+        date_from, date_to: YYYY-MM-DD, inclusive
+        min_amount, max_amount: Amount bounds
+        search: Payment reference prefix
+        cursor, page_size, count: Cursor pagination
+    """
     try:
-        headers = {
-            'Authorization': f"Bearer {MonnifyAuth.get_access_token()['token']}",
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-        
-        # Get parameters from query_params instead of data
         account_reference = request.query_params.get("account_reference")
-        
+
         if not account_reference:
             return Response({
                 "error": "account_reference is required"
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Build the URL with query parameters - using a large size to get all transactions
-        base_url = os.getenv("MONIFY_BASE_URL")
-        if not base_url:
-            logger.error("MONIFY_BASE_URL not configured")
-            return Response({
-                "error": "Service misconfiguration: API base URL not found"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-        url = f"{base_url}/bank-transfer/reserved-accounts/transactions?accountReference={account_reference}&page=0&size=1000"
-        
-        response = requests.get(url, headers=headers, timeout=30).json()
-        
-        if not response.get("requestSuccessful", False):
-            error_message = response.get("responseMessage", "Unknown error")
-            error_code = response.get("responseCode", "unknown")
-            
+
+        event = Events.objects.filter(event_id=account_reference).only('event_author', 'has_reserved_account').first()
+        user = request.user
+        owns_account = (
+            (event is not None and event.event_author == user.username)
+            or user.virtual_account_reference == account_reference
+        )
+        if not (owns_account or user.is_superuser):
             return Response({
-                "error": error_message,
-                "error_code": error_code
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Extract only the transactions from the response
-        transactions = response.get("responseBody", {}).get("content", [])
-        
-        # Format the transactions to include only necessary information
-        formatted_transactions = []
-        for transaction in transactions:
-            formatted_transaction = {
-                "amount": transaction.get("amount"),
-                "currency": transaction.get("currencyCode"),
-                "status": transaction.get("paymentStatus"),
-                "reference": transaction.get("paymentReference"),
-                "date": transaction.get("completedOn"),
-                "description": transaction.get("paymentDescription"),
-                "payment_method": transaction.get("paymentMethod")
+                "error": "Reserved account not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        sync_state = ReservedAccountSyncState.objects.filter(account_reference=account_reference).first()
+        if event is not None and event.has_reserved_account and is_sync_stale(sync_state):
+            # Serve what we have now; the page catches up on the next load
+            transaction.on_commit(lambda: sync_reserved_account_task.delay(account_reference))
+
+        transactions = ReservedAccountTransaction.objects.filter(account_reference=account_reference)
+        params = request.query_params
+        try:
+            if params.get("status"):
+                transactions = transactions.filter(payment_status=params["status"].upper())
+            transactions = transactions.filter(parse_date_range(params, "completed_on"))
+            if params.get("min_amount"):
+                transactions = transactions.filter(amount__gte=Decimal(params["min_amount"]))
+            if params.get("max_amount"):
+                transactions = transactions.filter(amount__lte=Decimal(params["max_amount"]))
+        except InvalidOperation:
+            return Response({"error": "min_amount and max_amount must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get("search"):
+            transactions = transactions.filter(payment_reference__startswith=params["search"].strip())
+
+        page_size = get_page_size(request, default=20)
+        rows, pagination = paginate_cursor(request, transactions, "-completed_on", page_size)
+
+        formatted_transactions = [
+            {
+                "amount": row.amount,
+                "currency": row.currency_code,
+                "status": row.payment_status,
+                "reference": row.payment_reference,
+                "date": row.completed_on,
+                "description": row.payment_description,
+                "payment_method": row.payment_method
             }
-            formatted_transactions.append(formatted_transaction)
-            
+            for row in rows
+        ]
+
         return Response({
-            "transactions": formatted_transactions
+            "transactions": formatted_transactions,
+            "pagination": pagination,
+            "last_synced_at": sync_state.last_synced_at if sync_state else None
         }, status=status.HTTP_200_OK)
-    except requests.exceptions.RequestException as req_err:
-        logger.error(f"Request to Monnify API failed: {str(req_err)}")
+    except ValueError as e:
         return Response({
-            "error": "Payment provider service unavailable",
-            "detail": str(req_err)
-        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            "error": str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logger.exception(f"Error fetching transactions: {str(e)}")
         return Response({
@@ -109,19 +130,6 @@ def createReservedAccount(request):
                 "error": "Event not found"
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Get access token
-        access_token = MonnifyAuth.get_access_token()
-        if not access_token or 'token' not in access_token:
-            logger.error("Failed to obtain Monnify access token")
-            return Response({
-                "error": "Failed to authenticate with payment provider"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        headers = {
-            'Authorization': f"Bearer {access_token['token']}",
-            'Content-Type': 'application/json'
-        }
-        
         base_url = os.getenv("MONIFY_BASE_URL")
         contract_code = os.getenv("MONIFY_CONTRACT_CODE")
         
@@ -142,11 +150,10 @@ def createReservedAccount(request):
             "getAllAvailableBanks": "true",
         }
         
-        response = requests.post(
-            f"{base_url}/bank-transfer/reserved-accounts", 
-            headers=headers, 
-            json=payload,
-            timeout=30
+        response = monnify_client.post(
+            "/bank-transfer/reserved-accounts",
+            endpoint='create_reserved_account',
+            json=payload
         ).json()
         
         if not response.get("requestSuccessful", False):
@@ -171,7 +178,7 @@ def createReservedAccount(request):
         # Update the user's virtual account reference
         user = request.user
         user.virtual_account_reference = response["responseBody"]["accountReference"]
-        user.save()
+        user.save(update_fields=['virtual_account_reference'])
         
         # Get response body data
         response_body = response.get("responseBody", {})
@@ -204,6 +211,11 @@ def createReservedAccount(request):
             "account_details": account_details
         }, status=status.HTTP_200_OK)
                                                                             
+    except MonnifyAuthError:
+        logger.error("Failed to obtain Monnify access token")
+        return Response({
+            "error": "Failed to authenticate with payment provider"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     except requests.exceptions.RequestException as req_err:
         logger.error(f"Request to Monnify API failed: {str(req_err)}")
         return Response({
@@ -271,183 +283,81 @@ def deleteReservedAccount(request, account_reference=None):
         Response: JSON response from Monnify API or error details
     """
     try:
-        logger.info("Starting reserved account deletion")
-        
         # Get account_reference from URL path param or query param
         if account_reference is None:
-            if request is not None:
-                account_reference = request.query_params.get("account_reference")
-            else:
-                logger.error("Account reference not provided for deletion")
-                return {"error": "account_reference is required", "status_code": status.HTTP_400_BAD_REQUEST}
+            account_reference = request.query_params.get("account_reference")
         
         # Validate input
         if not account_reference or not isinstance(account_reference, str):
-            error_msg = "Valid account_reference is required"
             logger.error(f"Invalid account reference: {account_reference}")
-            return Response({"error": error_msg}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"error": "Valid account_reference is required"}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get Monnify base URL using the consistent MONIFY spelling
-        base_url = os.getenv('MONIFY_BASE_URL')
-        if not base_url:
+        if not os.getenv('MONIFY_BASE_URL'):
             logger.error("MONIFY_BASE_URL not configured")
             return Response(
                 {"error": "Service misconfiguration: API base URL not found"}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
-        # Get access token
-        access_token = MonnifyAuth.get_access_token()
-        if not access_token or 'token' not in access_token:
-            logger.error("Failed to obtain Monnify access token")
-            return Response(
-                {"error": "Failed to authenticate with payment provider"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-                
-        headers = {
-            'Authorization': f"Bearer {access_token['token']}",
-            'Content-Type': 'application/json'
-        }
-        
         logger.info(f"Deleting reserved account: {account_reference}")
-        
-        # Log the request details (without sensitive info)
-        request_url = f"{base_url}/bank-transfer/reserved-accounts/reference/{account_reference}"
-        logger.info(f"Sending delete request to: {request_url}")
-        
-        # Make API request
-        api_response = requests.delete(
-            request_url, 
-            headers=headers,
-            timeout=30
-        )
-        
-        # Log response status before raising any exceptions
-        logger.info(f"Monnify API response status: {api_response.status_code}")
-        
-        # For 404, consider account already deleted
-        if api_response.status_code == 404:
+        deleted, response_data = delete_reserved_account(account_reference)
+        if not deleted:
             logger.warning(f"Account {account_reference} not found on Monnify - considering already deleted")
-            if request is None:
-                return {"message": "Account already deleted or not found", "status_code": status.HTTP_200_OK}
-            return Response({"message": "Account already deleted or not found"}, status=status.HTTP_200_OK)
-        
-        # Check for HTTP errors
-        api_response.raise_for_status()
-        
-        # Parse response - safely handle JSON parsing
-        try:
-            response_data = api_response.json()
-        except ValueError:
-            # Handle case where response is not JSON
-            response_data = {"message": "Account successfully deleted"}
-            logger.info("API response was not JSON, using default success message")
         
-        # Update user data if successful
-        if request is not None and hasattr(request, 'user'):
-            user = request.user
-            user.virtual_account_reference = None
-            user.save()
+        # The account is gone either way, so the user no longer has one
+        mark_reserved_accounts_deleted([account_reference])
+        user = request.user
+        user.virtual_account_reference = None
+        user.save(update_fields=['virtual_account_reference'])
         
-        # Log success
         logger.info(f"Successfully deleted reserved account: {account_reference}")
-        
-        # Return appropriate response based on caller
-        if request is None:
-            return {"data": response_data, "status_code": status.HTTP_200_OK}
-        
         return Response(response_data, status=status.HTTP_200_OK)
         
     except requests.exceptions.HTTPError as http_err:
         # Handle HTTP error responses (4XX, 5XX)
-        error_msg = f"Monnify API error: {str(http_err)}"
-        logger.error(error_msg)
+        logger.error(f"Monnify API error: {str(http_err)}")
         
-        # Extract status code and response body for more detailed error handling
         status_code = http_err.response.status_code
-        
         try:
-            error_response = http_err.response.json()
-            error_detail = error_response.get('responseMessage', str(http_err))
+            error_detail = http_err.response.json().get('responseMessage', str(http_err))
         except ValueError:
             error_detail = str(http_err)
         
         # Map common error codes to appropriate responses
         if status_code == 400:
-            # Handle Bad Request specifically
             logger.error(f"Bad request to Monnify API: {error_detail}")
-            
-            if "does not exist" in error_detail.lower() or "not found" in error_detail.lower():
-                message = "Account reference not found or already deleted"
-                # Still update user if the account doesn't exist
-                if request is not None and hasattr(request, 'user'):
-                    request.user.virtual_account_reference = None
-                    request.user.save()
-            else:
-                message = "Invalid request to payment provider"
-                
-            if request is None:
-                return {"error": message, "detail": error_detail, "status_code": status.HTTP_400_BAD_REQUEST}
-            
             return Response(
-                {"error": message, "detail": error_detail},
+                {"error": "Invalid request to payment provider", "detail": error_detail},
                 status=status.HTTP_400_BAD_REQUEST
             )
         elif status_code == 401 or status_code == 403:
-            message = "Authentication error with payment provider"
-            if request is None:
-                return {"error": message, "detail": error_detail, "status_code": status.HTTP_502_BAD_GATEWAY}
-            
-            return Response(
-                {"error": message, "detail": error_detail},
-                status=status.HTTP_502_BAD_GATEWAY
-            )
-        else:
-            # Handle other HTTP errors
-            if request is None:
-                return {"error": "Payment provider service error", "detail": error_detail, "status_code": status.HTTP_502_BAD_GATEWAY}
-            
             return Response(
-                {"error": "Payment provider service error", "detail": error_detail},
+                {"error": "Authentication error with payment provider", "detail": error_detail},
                 status=status.HTTP_502_BAD_GATEWAY
             )
+        return Response(
+            {"error": "Payment provider service error", "detail": error_detail},
+            status=status.HTTP_502_BAD_GATEWAY
+        )
             
+    except MonnifyAuthError:
+        logger.error("Failed to obtain Monnify access token")
+        return Response(
+            {"error": "Failed to authenticate with payment provider"}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+        
     except requests.exceptions.RequestException as req_err:
         # Handle other request errors (timeouts, connection issues)
-        error_msg = f"Request to Monnify API failed: {str(req_err)}"
-        logger.error(error_msg)
-        
-        if request is None:
-            return {"error": "Payment provider service unavailable", "detail": str(req_err), "status_code": status.HTTP_503_SERVICE_UNAVAILABLE}
-        
+        logger.error(f"Request to Monnify API failed: {str(req_err)}")
         return Response(
             {"error": "Payment provider service unavailable", "detail": str(req_err)},
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
         
-    except ValueError as json_err:
-        # Handle JSON parsing errors
-        error_msg = f"Invalid response from Monnify API: {str(json_err)}"
-        logger.error(error_msg)
-        
-        if request is None:
-            return {"error": error_msg, "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}
-        
-        return Response(
-            {"error": "Unexpected response from payment provider", "detail": str(json_err)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
-        
     except Exception as e:
-        # Catch-all for any other errors
-        error_msg = f"Error deleting reserved account {account_reference}: {str(e)}"
-        logger.exception(error_msg)
-        
-        if request is None:
-            return {"error": error_msg, "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}
-        
+        logger.exception(f"Error deleting reserved account {account_reference}: {str(e)}")
         return Response(
             {"error": "Failed to delete reserved account", "detail": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
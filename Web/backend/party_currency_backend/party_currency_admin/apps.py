@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PartyCurrencyAdminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'party_currency_admin'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,96 @@
+import csv
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+# Output is flushed to the client in blocks of about this many bytes
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+TRANSACTION_EXPORT_FIELDS = [
+    'payment_reference', 'transaction_reference', 'status', 'amount', 'currency_code',
+    'customer_name', 'customer_email', 'event_id', 'payment_description', 'created_at', 'updated_at',
+]
+EVENT_EXPORT_FIELDS = [
+    'event_id', 'event_name', 'event_author', 'start_date', 'end_date', 'street_address', 'city',
+    'state', 'LGA', 'postal_code', 'delivery_address', 'delivery_status', 'payment_status',
+    'has_reserved_account', 'created_at',
+]
+USER_EXPORT_FIELDS = [
+    'username', 'email', 'first_name', 'last_name', 'type', 'is_active', 'phone_number', 'city',
+    'state', 'country', 'date_joined', 'last_login', 'total_amount',
+]
+
+
+class _Echo:
+    """File-like object whose write() hands back what it was given, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheets read cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_safe(value):
+    """Prefix user-supplied text a spreadsheet would evaluate, so it stays text"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_safe(value) for value in row])
+
+
+def _ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+def _buffered(lines):
+    """Group small lines into blocks so every row isn't its own write"""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_BUFFER_SIZE:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def _gzipped(blocks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(queryset, fields, export_format, compress=False):
+    """
+    Yield the encoded export of `fields` for every row of `queryset`.
+
+    Rows are read as tuples through a server-side cursor and encoded as they
+    arrive, so memory use doesn't grow with the size of the table.
+    """
+    rows = queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    lines = _csv_lines(fields, rows) if export_format == 'csv' else _ndjson_lines(fields, rows)
+    blocks = _buffered(lines)
+    return _gzipped(blocks) if compress else blocks
@@ -0,0 +1,58 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+
+# Must match the config of the search_vector columns
+SEARCH_CONFIG = 'simple'
+
+# Longest search string accepted, anything beyond is ignored
+MAX_SEARCH_LENGTH = 100
+
+# Fields matched fuzzily on top of full text, the ones people misspell
+EVENT_TRIGRAM_FIELDS = ('event_name',)
+TRANSACTION_TRIGRAM_FIELDS = ('customer_name', 'customer_email')
+
+_TERM = re.compile(r"[\w@.+-]+")
+
+
+def build_search_query(search):
+    """
+    Turn free text into a prefix-matching tsquery, so "chi wed" finds
+    "Chioma's Wedding". Returns None when there is nothing searchable.
+    """
+    terms = _TERM.findall(search[:MAX_SEARCH_LENGTH])
+    if not terms:
+        return None
+    raw = " & ".join("'{}':*".format(term.replace("'", "''")) for term in terms)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_queryset(queryset, search, trigram_fields=()):
+    """
+    Filter a queryset with a search_vector column down to rows matching `search`
+    in full text, or fuzzily on any of `trigram_fields`, annotated with a
+    `search_rank` to order by.
+
+    Both halves of the filter are served by GIN indexes.
+    """
+    search = search.strip()[:MAX_SEARCH_LENGTH]
+    query = build_search_query(search)
+    if query is None:
+        return queryset.none()
+
+    condition = Q(search_vector=query)
+    for field in trigram_fields:
+        condition |= Q(**{f"{field}__trigram_word_similar": search})
+
+    rank = SearchRank(F('search_vector'), query)
+    if trigram_fields:
+        rank = Greatest(rank, *(TrigramWordSimilarity(search, field) for field in trigram_fields))
+    # Ranks are real (float4); as double precision they survive the JSON round
+    # trip of a cursor exactly, so keyset comparisons on ties still match
+    rank = Cast(rank, FloatField())
+    return queryset.filter(condition).annotate(search_rank=rank)
+
+
+# Ordering of search results, best match first
+RELEVANCE_ORDERING = ['-search_rank', '-created_at']
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from authentication.models import CustomUser, Merchant
+from events.models import Events
+from payment.models import Transaction
+from .utils import invalidate_admin_statistics
+
+# Saves touching only these fields can't change any dashboard count
+UNCOUNTED_FIELDS = {'last_login', 'updated_at'}
+
+
+def invalidate_on_save(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= UNCOUNTED_FIELDS:
+        return
+    invalidate_admin_statistics()
+
+
+# Writes made through QuerySet.update() don't send these signals; callers doing
+# bulk updates of these models invalidate the statistics themselves.
+for model in (CustomUser, Merchant, Events, Transaction):
+    post_save.connect(invalidate_on_save, sender=model, dispatch_uid=f"admin_statistics_save_{model.__name__}")
+    post_delete.connect(invalidate_admin_statistics, sender=model, dispatch_uid=f"admin_statistics_delete_{model.__name__}")
@@ -1,3 +1,124 @@
+from unittest import mock
+from datetime import date, timedelta
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from events.models import Events
+from payment.models import Transaction
+from .exports import stream_export
+from .utils import compute_admin_statistics
 
 # Create your tests here.
+
+
+class AdminStatisticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass", first_name="Ad", last_name="Min"
+        )
+        for i in range(20):
+            CustomUser.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="pass",
+                first_name="U", last_name=str(i), is_active=i % 4 != 0,
+            )
+        for i in range(10):
+            Events.objects.create(
+                event_id=f"EVT{i}", event_name=f"Event {i}", start_date=date.today(),
+                end_date=date.today(), delivery_address="Lagos",
+            )
+        for i in range(30):
+            Transaction.objects.create(
+                amount=1000, customer_email=f"user{i % 20}@example.com", payment_reference=f"party{i}",
+                transaction_reference=f"MNFY{i}", status=("successful", "pending", "failed")[i % 3],
+            )
+        # Push part of the data into the previous week
+        earlier = timezone.now() - timedelta(days=10)
+        CustomUser.objects.filter(username__in=["user1", "user2"]).update(date_joined=earlier)
+        Events.objects.filter(event_id__in=["EVT0", "EVT1", "EVT2"]).update(created_at=earlier)
+        Transaction.objects.filter(payment_reference__in=["party0", "party1"]).update(created_at=earlier)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_one_query_per_table(self):
+        with self.assertNumQueries(3):
+            stats = compute_admin_statistics()
+
+        self.assertEqual(stats['total_active_users'], 16)
+        self.assertEqual(stats['new_active_users_this_week'], 14)
+        self.assertEqual(stats['new_active_users_previous_week'], 2)
+        self.assertEqual(stats['percentage_increase'], 600.0)
+        self.assertEqual(stats['total_events'], 10)
+        self.assertEqual(stats['events_this_week'], 7)
+        self.assertEqual(stats['total_completed_transactions'], 10)
+        self.assertEqual(stats['total_pending_transactions'], 10)
+        self.assertEqual(stats['transactions_this_week'], 28)
+
+    def test_endpoint_serves_cached_snapshot(self):
+        with self.assertNumQueries(3):
+            first = self.client.get("/admin/get-admin-statistics")
+        with self.assertNumQueries(0):
+            second = self.client.get("/admin/get-admin-statistics")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+
+    def test_writes_invalidate_snapshot(self):
+        self.client.get("/admin/get-admin-statistics")
+        Events.objects.create(
+            event_id="EVTNEW", event_name="New", start_date=date.today(),
+            end_date=date.today(), delivery_address="Lagos",
+        )
+
+        response = self.client.get("/admin/get-admin-statistics")
+        self.assertEqual(response.json()['total_events'], 11)
+
+
+class BulkUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        for i in range(6):
+            CustomUser.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="pass", is_active=i % 2 == 0,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_is_active_false_string_targets_inactive_users(self):
+        response = self.client.post(
+            "/admin/bulk-delete-users", {"filter": {"is_active": "false", "role": "user"}}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(row['username'] for row in response.json()['results']), ["user1", "user3", "user5"]
+        )
+        self.assertEqual(CustomUser.objects.filter(username__startswith="user", is_active=True).count(), 3)
+
+    def test_invalid_is_active_is_rejected(self):
+        response = self.client.post("/admin/bulk-suspend-users", {"filter": {"is_active": "yes"}}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_filter_matching_too_many_users_changes_nothing(self):
+        with mock.patch('party_currency_admin.utils.MAX_BULK_USERS', 2):
+            response = self.client.post("/admin/bulk-suspend-users", {"filter": {"role": "user"}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(CustomUser.objects.filter(username__startswith="user", is_active=True).count(), 3)
+
+
+class ExportTests(TestCase):
+    def test_csv_cells_are_not_formulas(self):
+        Transaction.objects.create(
+            amount=-5, customer_name='=HYPERLINK("http://x")', customer_email="a@example.com",
+            payment_reference="party1", payment_description="@SUM(A1)", status="successful",
+        )
+        fields = ['customer_name', 'payment_description', 'amount']
+        output = b"".join(stream_export(Transaction.objects.all(), fields, 'csv')).decode()
+        self.assertEqual(output.splitlines()[1], '"\'=HYPERLINK(""http://x"")",\'@SUM(A1),-5.00')
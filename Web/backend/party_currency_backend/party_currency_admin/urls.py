@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import get_users, suspend_user, activate_user, delete_user, get_admin_statistics, get_events, get_pending_events, get_user, change_event_status, get_transactions, get_event_transaction
+from .views import get_users, suspend_user, activate_user, delete_user, get_admin_statistics, get_cache_statistics, get_events, get_pending_events, get_user, change_event_status, get_transactions, get_event_transaction, render_print_sheets, get_print_sheets_status, download_print_sheet, bulk_suspend_users, bulk_activate_users, bulk_delete_users_view, export_transactions, export_events, export_users
 
 
 urlpatterns = [
@@ -7,13 +7,23 @@ urlpatterns = [
     path('suspend-user/<str:user_id>', suspend_user, name='suspend_user'),
     path('activate-user/<str:user_id>', activate_user, name='activate_user'),
     path('delete-user/<str:user_id>', delete_user, name='delete_user'),
+    path('bulk-suspend-users', bulk_suspend_users, name='bulk_suspend_users'),
+    path('bulk-activate-users', bulk_activate_users, name='bulk_activate_users'),
+    path('bulk-delete-users', bulk_delete_users_view, name='bulk_delete_users'),
     path('get-admin-statistics', get_admin_statistics, name='get_admin_statistics'),
+    path('get-cache-statistics', get_cache_statistics, name='get_cache_statistics'),
     path('get-events', get_events, name='get_events'),
     path('get-pending-event', get_pending_events, name='get_events_offset'),
     path('get-user', get_user, name='get_user'),
     path('change-event-status', change_event_status, name='change_event_status'),
     path('get-all-transactions', get_transactions, name='get_all_successful_transactions'),
     path('get-event-transaction', get_event_transaction, name='get_event_transaction'),
+    path('export-transactions', export_transactions, name='export_transactions'),
+    path('export-events', export_events, name='export_events'),
+    path('export-users', export_users, name='export_users'),
+    path('render-print-sheets', render_print_sheets, name='render_print_sheets'),
+    path('print-sheets-status/<str:job_id>', get_print_sheets_status, name='print_sheets_status'),
+    path('download-print-sheet', download_print_sheet, name='download_print_sheet'),
 ]
 
 
@@ -0,0 +1,275 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
+from authentication.backends import invalidate_user_tokens
+from authentication.models import CustomUser
+from events.models import Events as Event
+from payment.models import Transaction
+from .search import search_queryset, EVENT_TRIGRAM_FIELDS, TRANSACTION_TRIGRAM_FIELDS
+
+# Dashboard statistics are cached briefly and dropped whenever a counted row changes
+ADMIN_STATISTICS_CACHE_KEY = "admin_statistics"
+ADMIN_STATISTICS_TTL = 60
+
+
+def percentage_change(current, previous):
+    if previous > 0:
+        return round(((current - previous) / previous) * 100, 2)
+    return 100 if current > 0 else 0
+
+
+def compute_admin_statistics(now=None):
+    """
+    Build the admin dashboard statistics with one conditional aggregate query per
+    table, comparing the last 7 days against the 7 days before them.
+    """
+    now = now or timezone.now()
+    start_of_this_period = now - timedelta(days=7)
+    start_of_previous_period = start_of_this_period - timedelta(days=7)
+
+    def in_period(field, start, end):
+        return Q(**{f"{field}__gte": start, f"{field}__lt": end})
+
+    users = CustomUser.objects.aggregate(
+        total_active=Count('pk', filter=Q(is_active=True)),
+        this_week=Count('pk', filter=Q(is_active=True) & in_period('date_joined', start_of_this_period, now)),
+        previous_week=Count('pk', filter=Q(is_active=True) & in_period('date_joined', start_of_previous_period, start_of_this_period)),
+    )
+    events = Event.objects.aggregate(
+        total=Count('pk'),
+        this_week=Count('pk', filter=in_period('created_at', start_of_this_period, now)),
+        previous_week=Count('pk', filter=in_period('created_at', start_of_previous_period, start_of_this_period)),
+    )
+    transactions = Transaction.objects.aggregate(
+        completed=Count('pk', filter=Q(status='successful')),
+        pending=Count('pk', filter=Q(status='pending')),
+        this_week=Count('pk', filter=in_period('created_at', start_of_this_period, now)),
+        previous_week=Count('pk', filter=in_period('created_at', start_of_previous_period, start_of_this_period)),
+    )
+
+    return {
+        'total_active_users': users['total_active'],
+        'new_active_users_this_week': users['this_week'],
+        'new_active_users_previous_week': users['previous_week'],
+        'percentage_increase': percentage_change(users['this_week'], users['previous_week']),
+        'total_completed_transactions': transactions['completed'],
+        'total_pending_transactions': transactions['pending'],
+        'transactions_this_week': transactions['this_week'],
+        'percentage_increase_transactions': percentage_change(transactions['this_week'], transactions['previous_week']),
+        'total_events': events['total'],
+        'events_this_week': events['this_week'],
+        'percentage_increase_events': percentage_change(events['this_week'], events['previous_week']),
+    }
+
+
+def get_admin_statistics_snapshot():
+    """Return the cached dashboard statistics, computing them on a miss"""
+    statistics = cache.get(ADMIN_STATISTICS_CACHE_KEY)
+    if statistics is None:
+        statistics = compute_admin_statistics()
+        cache.set(ADMIN_STATISTICS_CACHE_KEY, statistics, timeout=ADMIN_STATISTICS_TTL)
+    return statistics
+
+
+def invalidate_admin_statistics(**kwargs):
+    """Drop the cached dashboard statistics. Also usable as a signal receiver."""
+    cache.delete(ADMIN_STATISTICS_CACHE_KEY)
+
+
+# Upper bound on the users a single bulk request may touch
+MAX_BULK_USERS = 1000
+
+
+def search_users(queryset, search):
+    """Keep users matching every word of `search` in their email, first or last name"""
+    for term in search.split():
+        queryset = queryset.filter(
+            Q(email__icontains=term) |
+            Q(first_name__icontains=term) |
+            Q(last_name__icontains=term)
+        )
+    return queryset
+
+
+def select_bulk_users(usernames=None, filters=None):
+    """
+    Resolve the target of a bulk user operation, either an explicit list of
+    usernames or a filter (`search`, `role`, `is_active`).
+    Raises ValueError on invalid filters.
+    """
+    users = CustomUser.objects.all()
+    if usernames is not None:
+        return users.filter(username__in=usernames)
+
+    filters = filters or {}
+    if filters.get('search'):
+        users = search_users(users, filters['search'])
+    if filters.get('role'):
+        users = users.filter(type=filters['role'])
+    if 'is_active' in filters:
+        is_active = filters['is_active']
+        if is_active in ('true', 'false'):
+            is_active = is_active == 'true'
+        if not isinstance(is_active, bool):
+            raise ValueError('filter.is_active must be true or false')
+        users = users.filter(is_active=is_active)
+    return users
+
+
+def _lock_targets(users, acting_user):
+    """
+    Lock the targeted rows for the rest of the transaction and split off the ones
+    that can't be acted on. Returns (targets, results) where results already holds
+    the outcome of skipped users.
+    Raises ValueError, before anything is changed, when more than MAX_BULK_USERS match.
+    """
+    targets = list(users.select_for_update().values('pk', 'username', 'email', 'is_active')[:MAX_BULK_USERS + 1])
+    if len(targets) > MAX_BULK_USERS:
+        raise ValueError(f'More than {MAX_BULK_USERS} users match; narrow the filter down')
+    results = {}
+    if acting_user is not None:
+        for target in targets:
+            if target['pk'] == acting_user.pk:
+                results[target['username']] = 'skipped: cannot modify your own account'
+        targets = [target for target in targets if target['pk'] != acting_user.pk]
+    return targets, results
+
+
+def bulk_set_active(users, is_active, acting_user=None):
+    """
+    Suspend or activate users with a single UPDATE.
+
+    Returns:
+        dict: {username: outcome}
+    """
+    outcome = 'activated' if is_active else 'suspended'
+    with transaction.atomic():
+        targets, results = _lock_targets(users, acting_user)
+        changing = [target['pk'] for target in targets if target['is_active'] != is_active]
+        if changing:
+            CustomUser.objects.filter(pk__in=changing).update(is_active=is_active)
+
+    for target in targets:
+        results[target['username']] = outcome if target['is_active'] != is_active else f'already {outcome}'
+    # QuerySet.update() bypasses the signals that drop cached token lookups
+    invalidate_user_tokens(changing)
+    invalidate_admin_statistics()
+    return results
+
+
+def anonymise_transactions(users):
+    """
+    Replace the customer_email of every transaction made by `users` with
+    "<username> deleted", in one UPDATE.
+    """
+    username = CustomUser.objects.filter(email=OuterRef('customer_email')).values('username')[:1]
+    return Transaction.objects.filter(
+        customer_email__in=users.values('email')
+    ).update(customer_email=Concat(Subquery(username), Value(' deleted')))
+
+
+def bulk_delete_users(users, acting_user=None):
+    """
+    Delete users, anonymising their transactions first, inside one database
+    transaction.
+
+    Returns:
+        dict: {username: outcome}
+    """
+    with transaction.atomic():
+        targets, results = _lock_targets(users, acting_user)
+        if targets:
+            target_users = CustomUser.objects.filter(pk__in=[target['pk'] for target in targets])
+            anonymise_transactions(target_users)
+            target_users.delete()
+
+    for target in targets:
+        results[target['username']] = 'deleted'
+    invalidate_admin_statistics()
+    return results
+
+
+def parse_date_range(params, field):
+    """
+    Turn the `date_from`/`date_to` (YYYY-MM-DD, inclusive) parameters into a
+    filter on a datetime field that can use its index.
+    Raises ValueError on a malformed date.
+    """
+    condition = Q()
+    for param, lookup, offset in (('date_from', 'gte', 0), ('date_to', 'lt', 1)):
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date() + timedelta(days=offset)
+        except ValueError:
+            raise ValueError(f'Invalid {param} format. Use YYYY-MM-DD')
+        condition &= Q(**{f"{field}__{lookup}": timezone.make_aware(datetime.combine(day, time.min))})
+    return condition
+
+
+def filter_transactions(params):
+    """
+    Transactions matching the admin listing filters: `status` (successful, failed,
+    pending or all; default successful), `date_from`/`date_to` and `search`.
+    Raises ValueError on invalid filters.
+    """
+    status_filter = params.get('status', 'successful')
+    if status_filter == 'all':
+        transactions = Transaction.objects.all()
+    else:
+        transactions = Transaction.objects.filter(status=status_filter)
+
+    transactions = transactions.filter(parse_date_range(params, 'created_at'))
+
+    search = params.get('search', '')
+    if search:
+        transactions = search_queryset(transactions, search, TRANSACTION_TRIGRAM_FIELDS)
+    return transactions
+
+
+def filter_events(params):
+    """
+    Events matching the admin listing filters: `delivery_status`,
+    `date_from`/`date_to` (creation date) and `search`.
+    Raises ValueError on invalid filters.
+    """
+    events = Event.objects.all()
+    if params.get('delivery_status'):
+        events = events.filter(delivery_status=params['delivery_status'])
+
+    events = events.filter(parse_date_range(params, 'created_at'))
+
+    search = params.get('search', '')
+    if search:
+        events = search_queryset(events, search, EVENT_TRIGRAM_FIELDS)
+    return events
+
+
+def annotate_total_spent(users):
+    """Annotate each user's total successful spend as `total_amount`"""
+    spent = Transaction.objects.filter(
+        customer_email=OuterRef('email'),
+        status='successful',
+    ).order_by().values('customer_email').annotate(total=Sum('amount')).values('total')
+    return users.annotate(
+        total_amount=Coalesce(Subquery(spent), Value(Decimal('0')), output_field=DecimalField())
+    )
+
+
+def filter_users(params):
+    """
+    Users matching the admin directory filters: `search`, `role`, `is_active`
+    (true/false) and `date_from`/`date_to` (join date).
+    Raises ValueError on invalid filters.
+    """
+    users = search_users(CustomUser.objects.all(), params.get('search', ''))
+    if params.get('role'):
+        users = users.filter(type=params['role'])
+    if params.get('is_active') in ('true', 'false'):
+        users = users.filter(is_active=params['is_active'] == 'true')
+    return users.filter(parse_date_range(params, 'date_joined'))
@@ -4,45 +4,108 @@ from rest_framework.response import Response
 from authentication.models import CustomUser
 from payment.models import Transaction
 from events.models import Events as Event
-from rest_framework.authentication import TokenAuthentication, SessionAuthentication
+from rest_framework.authentication import SessionAuthentication
+from authentication.backends import CachedTokenAuthentication
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from events.serializers import EventSerializerFull
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
 import math
 from authentication.serializers import UserSerializer2
 from payment.serializers import TransactionSerializer
+from party_currency_backend.pagination import get_page_size, paginate_cursor, paginate_page_numbers, uses_page_numbers
+from .search import search_queryset, RELEVANCE_ORDERING, EVENT_TRIGRAM_FIELDS
+from .utils import (
+    search_users, select_bulk_users, bulk_set_active, bulk_delete_users,
+    anonymise_transactions, annotate_total_spent, filter_transactions, filter_events, filter_users, MAX_BULK_USERS,
+    get_admin_statistics_snapshot,
+)
+from django.db import transaction
+from currencies.models import Currency
+from currencies.tasks import render_print_sheets_task, get_print_job_status, set_print_job_status, PRINT_SHEETS_PREFIX
+from django.core.files.storage import default_storage
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.conf import settings
+from django.core.cache import cache
+from .exports import stream_export, EXPORT_FORMATS, TRANSACTION_EXPORT_FIELDS, EVENT_EXPORT_FIELDS, USER_EXPORT_FIELDS
+import os
+import uuid
 # Your existing views remain the same...
 
+PRINT_SHEET_FORMATS = ('pdf', 'png')
+
+
+def paginate_listing(request, queryset, sort_fields, page_size):
+    """Numbered pages when the client asks for `page`, cursor pages otherwise"""
+    if uses_page_numbers(request):
+        if isinstance(sort_fields, str):
+            sort_fields = [sort_fields]
+        return paginate_page_numbers(queryset.order_by(*sort_fields, 'pk'), request.GET.get('page'), page_size)
+    return paginate_cursor(request, queryset, sort_fields, page_size)
+
+
+# sort_by values of the pending/offset event listings. "title" and "date" are
+# kept for existing clients.
+EVENT_SORT_FIELDS = {
+    'created_at': 'created_at',
+    '-created_at': '-created_at',
+    'title': 'event_name',
+    '-title': '-event_name',
+    'date': 'start_date',
+    '-date': '-start_date',
+}
+MAX_PRINT_COPIES = 100
+
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_users(request):
+    """
+    Cursor-paginated user directory, newest first, with each user's total
+    successful spend. `search` matches every word against email, first or last name.
+    """
     if not request.user.is_superuser:
         return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
-        
-    users = CustomUser.objects.all()
-    tran = Transaction.objects.filter(customer_email=request.user.email)
-    total = 0
-    for t in tran:
-        if t.status == 'success':  # Fixed bug: was tran.status instead of t.status
-            total += t.amount
-        
+
+    search = request.GET.get('search', '').strip()
+    try:
+        page_size = get_page_size(request, default=20)
+    except ValueError:
+        return Response({'error': 'Invalid page_size parameter'}, status=400)
+
+    users = annotate_total_spent(CustomUser.objects.all()).only(
+        'username', 'email', 'first_name', 'last_name', 'type', 'is_active', 'last_login', 'date_joined'
+    )
+
+    # Each icontains is served by the trigram indexes on CustomUser
+    users = search_users(users, search)
+
+    try:
+        page, pagination = paginate_cursor(request, users, '-date_joined', page_size)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
     user_data = []
-    for user in users:
+    for user in page:
         user_data.append({
             'username': user.username,
+            'email': user.email,
             'name': f"{user.first_name} {user.last_name}",
             'role': user.type,
             'isActive': user.is_active,
             "last_login": user.last_login,
-            "total_amount": f"₦{total}"
+            "total_amount": f"₦{user.total_amount}"
         })
-    return Response({'users': user_data})
+    return Response({
+        'users': user_data,
+        'pagination': pagination,
+        'filters': {
+            'search': search,
+        }
+    })
 
 
 @api_view(['PUT'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def suspend_user(request, user_id):
     if not request.user.is_superuser:
@@ -51,7 +114,7 @@ def suspend_user(request, user_id):
     try:
         user = CustomUser.objects.get(username=user_id)
         user.is_active = False
-        user.save()
+        user.save(update_fields=['is_active'])
         return Response({'message': 'User suspended successfully'}, status=200)
     except CustomUser.DoesNotExist:
         return Response({'error': 'User not found'}, status=404)
@@ -60,7 +123,7 @@ def suspend_user(request, user_id):
 
 
 @api_view(['PUT'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def activate_user(request, user_id):
     if not request.user.is_superuser:
@@ -69,7 +132,7 @@ def activate_user(request, user_id):
     try:
         user = CustomUser.objects.get(username=user_id)
         user.is_active = True
-        user.save()
+        user.save(update_fields=['is_active'])
         return Response({'message': 'User activated successfully'}, status=200)
     except CustomUser.DoesNotExist:
         return Response({'error': 'User not found'}, status=404)
@@ -78,7 +141,7 @@ def activate_user(request, user_id):
 
 
 @api_view(['DELETE'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_user(request, user_id):
     if not request.user.is_superuser:
@@ -86,14 +149,10 @@ def delete_user(request, user_id):
     
     try:
         user = CustomUser.objects.get(username=user_id)
-        transactions = Transaction.objects.filter(customer_email=user.email)
-        
-        # Update all related transactions
-        for transaction in transactions:
-            transaction.customer_email = f"{user.username} deleted"
-            transaction.save()
-            
-        user.delete()
+        with transaction.atomic():
+            # Update all related transactions
+            anonymise_transactions(CustomUser.objects.filter(pk=user.pk))
+            user.delete()
         return Response({'message': 'User deleted successfully'}, status=200)
     except CustomUser.DoesNotExist:
         return Response({'error': 'User not found'}, status=404)
@@ -101,134 +160,149 @@ def delete_user(request, user_id):
         return Response({'error': f'An error occurred: {str(e)}'}, status=500)
 
 
-from django.db.models import Count
-from django.utils import timezone
-from datetime import timedelta
+def parse_bulk_users(request):
+    """
+    Read the target of a bulk user request: either `usernames` (a list) or
+    `filter` (an object with search/role/is_active). Returns (usernames, queryset)
+    or raises ValueError.
+    """
+    usernames = request.data.get('usernames')
+    filters = request.data.get('filter')
+    if usernames is None and filters is None:
+        raise ValueError('Provide either usernames or filter')
+    if usernames is not None:
+        if not isinstance(usernames, list) or not all(isinstance(username, str) for username in usernames):
+            raise ValueError('usernames must be a list of usernames')
+        if len(usernames) > MAX_BULK_USERS:
+            raise ValueError(f'At most {MAX_BULK_USERS} users can be changed at once')
+        return usernames, select_bulk_users(usernames=usernames)
+    if not isinstance(filters, dict) or not filters:
+        raise ValueError('filter must be a non-empty object')
+    return None, select_bulk_users(filters=filters)
+
+
+def bulk_user_response(usernames, results):
+    if usernames is not None:
+        for username in usernames:
+            results.setdefault(username, 'not found')
+    return Response({
+        'message': f'{len(results)} users processed',
+        'results': [{'username': username, 'result': result} for username, result in results.items()],
+    }, status=200)
+
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_suspend_users(request):
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    try:
+        usernames, users = parse_bulk_users(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    try:
+        return bulk_user_response(usernames, bulk_set_active(users, False, acting_user=request.user))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_activate_users(request):
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    try:
+        usernames, users = parse_bulk_users(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    try:
+        return bulk_user_response(usernames, bulk_set_active(users, True, acting_user=request.user))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_delete_users_view(request):
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    try:
+        usernames, users = parse_bulk_users(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    try:
+        return bulk_user_response(usernames, bulk_delete_users(users, acting_user=request.user))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': f'An error occurred: {str(e)}'}, status=500)
+
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_admin_statistics(request):
     if not request.user.is_superuser:
         return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
     
     try:
-        # Get current date and time
-        now = timezone.now()
-        
-        # Define periods: last 7 days and previous 7 days
-        start_of_this_period = now - timedelta(days=7)
-        start_of_previous_period = start_of_this_period - timedelta(days=7)
-        
-        # Get total active users count
-        total_active_users = CustomUser.objects.filter(is_active=True).count()
-        # Get total events
-        total_events = Event.objects.all().count()
-        # Get total transactions completed
-        total_completed_transactions = Transaction.objects.filter(status='successful').count()
-        # Get total transactions pending
-        total_pending_transactions = Transaction.objects.filter(status='pending').count()
-        
-        # Get new active users in this period (last 7 days)
-        new_users_this_week = CustomUser.objects.filter(
-            is_active=True,
-            date_joined__gte=start_of_this_period,
-            date_joined__lt=now
-        ).count()
-        # Get new active users in previous period (previous 7 days)
-        new_users_previous_week = CustomUser.objects.filter(
-            is_active=True,
-            date_joined__gte=start_of_previous_period,
-            date_joined__lt=start_of_this_period
-        ).count()
-        
-        # Get transactions in this period (last 7 days)
-        transactions_this_week = Transaction.objects.filter(
-            created_at__gte=start_of_this_period,
-            created_at__lt=now
-        ).count()
-        # Get transactions in previous period (previous 7 days)
-        transactions_previous_week = Transaction.objects.filter(
-            created_at__gte=start_of_previous_period,
-            created_at__lt=start_of_this_period
-        ).count()
-        
-        # Get events in this period (last 7 days)
-        events_this_week = Event.objects.filter(
-            created_at__gte=start_of_this_period,
-            created_at__lt=now
-        ).count()
-        # Get events in previous period (previous 7 days)
-        events_previous_week = Event.objects.filter(
-            created_at__gte=start_of_previous_period,
-            created_at__lt=start_of_this_period
-        ).count()
-        
-        # Calculate percentage increase for users
-        if new_users_previous_week > 0:
-            percentage_increase = ((new_users_this_week - new_users_previous_week) / 
-                                  new_users_previous_week) * 100
-        else:
-            percentage_increase = 100 if new_users_this_week > 0 else 0
-            
-        # Calculate percentage increase for transactions
-        if transactions_previous_week > 0:
-            percentage_increase_transactions = ((transactions_this_week - transactions_previous_week) / 
-                                               transactions_previous_week) * 100
-        else:
-            percentage_increase_transactions = 100 if transactions_this_week > 0 else 0
-            
-        # Calculate percentage increase for events
-        if events_previous_week > 0:
-            percentage_increase_events = ((events_this_week - events_previous_week) / 
-                                         events_previous_week) * 100
-        else:
-            percentage_increase_events = 100 if events_this_week > 0 else 0
-        
-        return Response({
-            'total_active_users': total_active_users,
-            'new_active_users_this_week': new_users_this_week,
-            'new_active_users_previous_week': new_users_previous_week,
-            'percentage_increase': round(percentage_increase, 2),
-            'total_completed_transactions': total_completed_transactions,
-            'total_pending_transactions': total_pending_transactions,
-            'transactions_this_week': transactions_this_week,
-            'percentage_increase_transactions': round(percentage_increase_transactions, 2),
-            'total_events': total_events,
-            'events_this_week': events_this_week,
-            'percentage_increase_events': round(percentage_increase_events, 2)
-        }, status=200)
+        return Response(get_admin_statistics_snapshot(), status=200)
         
     except Exception as e:
         return Response({'error': f'An error occurred: {str(e)}'}, status=500)
 
 
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def get_cache_statistics(request):
+    """Hit/miss counters of the shared cache, as seen by the worker process answering"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    metrics = getattr(cache, 'metrics', None)
+    return Response({
+        'backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'pid': os.getpid(),
+        'metrics': metrics.snapshot() if metrics else None,
+    }, status=200)
+
+
 # NEW PAGINATED EVENTS VIEW WITH ENHANCED SORTING
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_events(request):
+    """
+    Events listing. Pages by cursor (`cursor`, `count`), or by number when
+    `page` is given for existing clients.
+    """
     if not request.user.is_superuser:
         return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
     
     try:
         # Get query parameters
-        page = request.GET.get('page', 1)
-        page_size = request.GET.get('page_size', 10)
         search = request.GET.get('search', '')
-        sort_by = request.GET.get('sort_by', 'newest')  # Default to newest first
+        sort_by = request.GET.get('sort_by', 'relevance' if search else 'newest')  # Default to best match, else newest first
         
-        # Convert to integers
         try:
-            page = int(page)
-            page_size = int(page_size)
+            page_size = get_page_size(request)
         except ValueError:
             return Response({'error': 'Invalid page or page_size parameter'}, status=400)
         
-        # Limit page_size to prevent abuse
-        if page_size > 100:
-            page_size = 100
-        
         # Define sort parameter mapping
         sort_mapping = {
             'newest': '-created_at',           # Newest events first
@@ -244,38 +318,18 @@ def get_events(request):
         
         # Apply search filter if provided
         if search:
-            events_queryset = events_queryset.filter(
-                Q(event_name__icontains=search) |
-                Q(event_description__icontains=search) |
-                Q(street_address__icontains=search) |
-                Q(city__icontains=search) |
-                Q(state__icontains=search) |
-                Q(event_author__icontains=search)|
-                Q(delivery_status__icontains=search)
-
-            )
-        
-        # Apply sorting
-        if sort_by in sort_mapping:
-            django_sort_field = sort_mapping[sort_by]
-            events_queryset = events_queryset.order_by(django_sort_field)
-        else:
-            # Default to newest if invalid sort parameter
-            events_queryset = events_queryset.order_by('-created_at')
+            events_queryset = search_queryset(events_queryset, search, EVENT_TRIGRAM_FIELDS)
         
-        # Create paginator
-        paginator = Paginator(events_queryset, page_size)
-        total_pages = paginator.num_pages
-        total_count = paginator.count
+        # Pick the sort, defaulting to newest if the parameter is invalid
+        if sort_by == 'relevance' and search:
+            sort_fields = RELEVANCE_ORDERING
+        else:
+            sort_fields = sort_mapping.get(sort_by, '-created_at')
         
         try:
-            events_page = paginator.page(page)
-        except PageNotAnInteger:
-            events_page = paginator.page(1)
-            page = 1
-        except EmptyPage:
-            events_page = paginator.page(paginator.num_pages)
-            page = paginator.num_pages
+            events_page, pagination = paginate_listing(request, events_queryset, sort_fields, page_size)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
         # Serialize the events
         serializer = EventSerializerFull(events_page, many=True)
@@ -283,20 +337,11 @@ def get_events(request):
         # Prepare response data
         response_data = {
             'events': serializer.data,
-            'pagination': {
-                'current_page': page,
-                'page_size': page_size,
-                'total_pages': total_pages,
-                'total_count': total_count,
-                'has_next': events_page.has_next(),
-                'has_previous': events_page.has_previous(),
-                'next_page': page + 1 if events_page.has_next() else None,
-                'previous_page': page - 1 if events_page.has_previous() else None,
-            },
+            'pagination': pagination,
             'filters': {
                 'search': search,
                 'sort_by': sort_by,
-                'available_sort_options': list(sort_mapping.keys())
+                'available_sort_options': ['relevance'] + list(sort_mapping.keys())
             }
         }
         
@@ -308,13 +353,14 @@ def get_events(request):
 
 # Optional: Add a helper view to get available sort options
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_sort_options(request):
     """
     Returns available sorting options for the events API
     """
     sort_options = {
+        'relevance': 'Best Match (when searching)',
         'newest': 'Newest First',
         'oldest': 'Oldest First', 
         'name_asc': 'Name A-Z',
@@ -330,7 +376,7 @@ def get_sort_options(request):
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_pending_events(request):
     if not request.user.is_superuser:
@@ -338,54 +384,32 @@ def get_pending_events(request):
     
     try:
         # Get query parameters
-        page = request.GET.get('page', 1)
-        page_size = request.GET.get('page_size', 10)  # Default to 10 events per page
         search = request.GET.get('search', '')
-        sort_by = request.GET.get('sort_by', '-created_at')  # Default sort by newest first
+        sort_by = request.GET.get('sort_by', 'relevance' if search else '-created_at')  # Default to best match, else newest first
         
-        # Convert to integers
         try:
-            page = int(page)
-            page_size = int(page_size)
+            page_size = get_page_size(request)
         except ValueError:
             return Response({'error': 'Invalid page or page_size parameter'}, status=400)
         
-        # Limit page_size to prevent abuse
-        if page_size > 100:
-            page_size = 100
-        
         # Start with all events
         events_queryset = Event.objects.filter(delivery_status='pending')
 
         
         # Apply search filter if provided
         if search:
-            events_queryset = events_queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(location__icontains=search)
-            )
-        
-        # Apply sorting
-        valid_sort_fields = ['created_at', '-created_at', 'title', '-title', 'date', '-date']
-        if sort_by in valid_sort_fields:
-            events_queryset = events_queryset.order_by(sort_by)
-        else:
-            events_queryset = events_queryset.order_by('-created_at')
+            events_queryset = search_queryset(events_queryset, search, EVENT_TRIGRAM_FIELDS)
         
-        # Create paginator
-        paginator = Paginator(events_queryset, page_size)
-        total_pages = paginator.num_pages
-        total_count = paginator.count
+        # Pick the sort
+        if sort_by == 'relevance' and search:
+            sort_fields = RELEVANCE_ORDERING
+        else:
+            sort_fields = EVENT_SORT_FIELDS.get(sort_by, '-created_at')
         
         try:
-            events_page = paginator.page(page)
-        except PageNotAnInteger:
-            events_page = paginator.page(1)
-            page = 1
-        except EmptyPage:
-            events_page = paginator.page(paginator.num_pages)
-            page = paginator.num_pages
+            events_page, pagination = paginate_listing(request, events_queryset, sort_fields, page_size)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
         # Serialize the events
         serializer = EventSerializerFull(events_page, many=True)
@@ -393,16 +417,7 @@ def get_pending_events(request):
         # Prepare response data
         response_data = {
             'events': serializer.data,
-            'pagination': {
-                'current_page': page,
-                'page_size': page_size,
-                'total_pages': total_pages,
-                'total_count': total_count,
-                'has_next': events_page.has_next(),
-                'has_previous': events_page.has_previous(),
-                'next_page': page + 1 if events_page.has_next() else None,
-                'previous_page': page - 1 if events_page.has_previous() else None,
-            },
+            'pagination': pagination,
             'filters': {
                 'search': search,
                 'sort_by': sort_by
@@ -416,62 +431,69 @@ def get_pending_events(request):
 
 # ALTERNATIVE: Offset-based pagination (if you prefer this approach)
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_events_offset(request):
+    """
+    Events listing paged by `offset`/`limit`, or by cursor when no offset is given.
+    """
     if not request.user.is_superuser:
         return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
     
     try:
         # Get query parameters
-        offset = int(request.GET.get('offset', 0))
-        limit = int(request.GET.get('limit', 10))
         search = request.GET.get('search', '')
-        sort_by = request.GET.get('sort_by', '-created_at')
+        sort_by = request.GET.get('sort_by', 'relevance' if search else '-created_at')
         
-        # Limit the limit to prevent abuse
-        if limit > 100:
-            limit = 100
+        try:
+            offset = int(request.GET.get('offset', 0))
+            limit = get_page_size(request, param='limit')
+        except ValueError:
+            return Response({'error': 'Invalid offset or limit parameter'}, status=400)
         
         # Start with all events
         events_queryset = Event.objects.all()
         # Apply search filter if provided
         if search:
-            events_queryset = events_queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(location__icontains=search)
-            )
-        
-        # Apply sorting
-        valid_sort_fields = ['created_at', '-created_at', 'title', '-title', 'date', '-date']
-        if sort_by in valid_sort_fields:
-            events_queryset = events_queryset.order_by(sort_by)
-        else:
-            events_queryset = events_queryset.order_by('-created_at')
+            events_queryset = search_queryset(events_queryset, search, EVENT_TRIGRAM_FIELDS)
         
-        # Get total count
-        total_count = events_queryset.count()
+        # Pick the sort
+        if sort_by == 'relevance' and search:
+            sort_fields = RELEVANCE_ORDERING
+        else:
+            sort_fields = EVENT_SORT_FIELDS.get(sort_by, '-created_at')
         
-        # Apply offset and limit
-        events = events_queryset[offset:offset + limit]
+        if uses_page_numbers(request, param='offset'):
+            # Get total count
+            total_count = events_queryset.count()
+            
+            # Apply offset and limit
+            if isinstance(sort_fields, str):
+                sort_fields = [sort_fields]
+            events = events_queryset.order_by(*sort_fields, 'pk')[offset:offset + limit]
+            
+            # Calculate if there are more items
+            has_next = (offset + limit) < total_count
+            pagination = {
+                'offset': offset,
+                'limit': limit,
+                'total_count': total_count,
+                'has_next': has_next,
+                'next_offset': offset + limit if has_next else None,
+            }
+        else:
+            try:
+                events, pagination = paginate_cursor(request, events_queryset, sort_fields, limit)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=400)
         
         # Serialize the events
         serializer = EventSerializerFull(events, many=True)
         
-        # Calculate if there are more items
-        has_next = (offset + limit) < total_count
-        
         # Prepare response data
         response_data = {
             'events': serializer.data,
-            'pagination': {
-                'offset': offset,
-                'limit': limit,
-                'total_count': total_count,
-                'has_next': has_next,
-                'next_offset': offset + limit if has_next else None,
-            },
+            'pagination': pagination,
             'filters': {
                 'search': search,
                 'sort_by': sort_by
@@ -488,7 +510,7 @@ def get_events_offset(request):
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_user(request):
         email =request.GET.get('email',None)
@@ -511,7 +533,7 @@ def get_user(request):
     
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def change_event_status(request):
     statuses = ['pending','delivered','cancelled','pending payment']
@@ -535,7 +557,7 @@ def change_event_status(request):
         return Response({'error': f'An error occurred: {str(e)}'}, status=500)
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_event_transaction(request):
     if not request.user.is_superuser:
@@ -553,7 +575,7 @@ def get_event_transaction(request):
     
 # Optional: Enhanced version with additional filters
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication, SessionAuthentication])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_transactions(request):
     """
@@ -564,24 +586,17 @@ def get_transactions(request):
     
     try:
         # Get query parameters
-        page = request.GET.get('page', 1)
-        page_size = request.GET.get('page_size', 10)
         search = request.GET.get('search', '')
-        sort_by = request.GET.get('sort_by', 'newest')
+        sort_by = request.GET.get('sort_by', 'relevance' if search else 'newest')
         status_filter = request.GET.get('status', 'successful')  # successful, failed, pending, all
         date_from = request.GET.get('date_from')  # YYYY-MM-DD format
         date_to = request.GET.get('date_to')      # YYYY-MM-DD format
         
-        # Convert to integers
         try:
-            page = int(page)
-            page_size = int(page_size)
+            page_size = get_page_size(request)
         except ValueError:
             return Response({'error': 'Invalid page or page_size parameter'}, status=400)
         
-        if page_size > 100:
-            page_size = 100
-        
         # Sort mapping
         sort_mapping = {
             'newest': '-created_at',
@@ -592,53 +607,22 @@ def get_transactions(request):
             'customer_desc': '-customer_name',
         }
         
-        # Start with all transactions or filter by status
-        if status_filter == 'all':
-            transactions_queryset = Transaction.objects.all()
-        else:
-            transactions_queryset = Transaction.objects.filter(status=status_filter)
-        
-        # Apply date filters
-        if date_from:
-            try:
-                from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-                transactions_queryset = transactions_queryset.filter(created_at__date__gte=from_date)
-            except ValueError:
-                return Response({'error': 'Invalid date_from format. Use YYYY-MM-DD'}, status=400)
-        
-        if date_to:
-            try:
-                to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
-                transactions_queryset = transactions_queryset.filter(created_at__date__lte=to_date)
-            except ValueError:
-                return Response({'error': 'Invalid date_to format. Use YYYY-MM-DD'}, status=400)
+        # Apply status, date and search filters
+        try:
+            transactions_queryset = filter_transactions(request.GET)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
-        # Apply search filter
-        if search:
-            transactions_queryset = transactions_queryset.filter(
-                Q(customer_name__icontains=search) |
-                Q(customer_email__icontains=search) |
-                Q(transaction_reference__icontains=search) |
-                Q(payment_reference__icontains=search) |
-                Q(event_id__icontains=search)
-            )
-        
-        # Apply sorting
-        if sort_by in sort_mapping:
-            transactions_queryset = transactions_queryset.order_by(sort_mapping[sort_by])
+        # Pick the sort, defaulting to newest if the parameter is invalid
+        if sort_by == 'relevance' and search:
+            sort_fields = RELEVANCE_ORDERING
         else:
-            transactions_queryset = transactions_queryset.order_by('-created_at')
-        
-        # Pagination
-        paginator = Paginator(transactions_queryset, page_size)
-        total_pages = paginator.num_pages
-        total_count = paginator.count
+            sort_fields = sort_mapping.get(sort_by, '-created_at')
         
         try:
-            transactions_page = paginator.page(page)
-        except (PageNotAnInteger, EmptyPage):
-            transactions_page = paginator.page(1)
-            page = 1
+            transactions_page, pagination = paginate_listing(request, transactions_queryset, sort_fields, page_size)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
         # Serialize
         serializer = TransactionSerializer(transactions_page, many=True)
@@ -647,14 +631,7 @@ def get_transactions(request):
         response_data = {
             'message': f'{status_filter.title()} transactions retrieved successfully',
             'transactions': serializer.data,
-            'pagination': {
-                'current_page': page,
-                'page_size': page_size,
-                'total_pages': total_pages,
-                'total_count': total_count,
-                'has_next': transactions_page.has_next(),
-                'has_previous': transactions_page.has_previous(),
-            },
+            'pagination': pagination,
             'filters': {
                 'search': search,
                 'sort_by': sort_by,
@@ -667,4 +644,143 @@ def get_transactions(request):
         return Response(response_data, status=200)
         
     except Exception as e:
-        return Response({'error': f'An error occurred: {str(e)}'}, status=500)
\ No newline at end of file
+        return Response({'error': f'An error occurred: {str(e)}'}, status=500)
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def render_print_sheets(request):
+    """
+    Queue rendering of print-ready sheets for every currency design of a paid event.
+    Poll print-sheets-status/<job_id> for progress and the resulting files.
+    """
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    event_id = request.data.get('event_id')
+    output_format = request.data.get('format', 'pdf')
+    try:
+        copies = int(request.data.get('copies', 1))
+    except (TypeError, ValueError):
+        return Response({'error': 'Invalid copies parameter'}, status=400)
+
+    if output_format not in PRINT_SHEET_FORMATS:
+        return Response({'error': f'Invalid format. Use one of: {", ".join(PRINT_SHEET_FORMATS)}'}, status=400)
+    if not 1 <= copies <= MAX_PRINT_COPIES:
+        return Response({'error': f'copies must be between 1 and {MAX_PRINT_COPIES}'}, status=400)
+    if output_format != 'pdf' and copies != 1:
+        return Response({'error': 'copies is only supported for pdf output'}, status=400)
+
+    try:
+        event = Event.objects.get(event_id=event_id)
+    except Event.DoesNotExist:
+        return Response({'error': 'Event not found'}, status=404)
+
+    if event.delivery_status != 'pending':
+        return Response({'error': 'Only paid events awaiting delivery can be printed'}, status=400)
+    if not Currency.objects.filter(event_id=event_id).exists():
+        return Response({'error': 'Event has no currency designs'}, status=400)
+
+    job_id = uuid.uuid4().hex
+    set_print_job_status(job_id, state='queued', event_id=event_id, total=0, done=0, files=[])
+    render_print_sheets_task.delay(job_id, event_id, output_format, copies)
+    return Response({'message': 'Print sheet rendering queued', 'job_id': job_id}, status=202)
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def get_print_sheets_status(request, job_id):
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    status = get_print_job_status(job_id)
+    if status is None:
+        return Response({'error': 'Print job not found'}, status=404)
+    return Response({'job_id': job_id, **status}, status=200)
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def download_print_sheet(request):
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    path = request.GET.get('path', '')
+    if not path.startswith(f"{PRINT_SHEETS_PREFIX}/") or '..' in path.split('/'):
+        return Response({'error': 'Invalid path'}, status=400)
+    if not default_storage.exists(path):
+        return Response({'error': 'File not found'}, status=404)
+    return FileResponse(default_storage.open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
+
+
+def export_response(request, queryset, fields, name):
+    """
+    Stream `queryset` as an attachment in the requested `export_format` (csv or
+    ndjson), gzipped when `gzip` is true. (`format` is taken by DRF's renderer
+    selection.)
+    """
+    export_format = request.GET.get('export_format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': f'Invalid export_format. Use one of: {", ".join(EXPORT_FORMATS)}'}, status=400)
+    compress = request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{name}-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+    if compress:
+        content_type = 'application/gzip'
+        filename += '.gz'
+
+    response = StreamingHttpResponse(
+        stream_export(queryset, fields, export_format, compress=compress),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def export_transactions(request):
+    """Export transactions, taking the same status, date_from, date_to and search filters as get-all-transactions"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    try:
+        transactions = filter_transactions(request.GET)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return export_response(request, transactions.order_by('created_at', 'pk'), TRANSACTION_EXPORT_FIELDS, 'transactions')
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def export_events(request):
+    """Export events, filtered by delivery_status, date_from, date_to and search"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    try:
+        events = filter_events(request.GET)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return export_response(request, events.order_by('created_at', 'pk'), EVENT_EXPORT_FIELDS, 'events')
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def export_users(request):
+    """Export users with their total spend, filtered by search, role, is_active, date_from and date_to"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Access denied. Superuser privileges required.'}, status=403)
+
+    try:
+        users = annotate_total_spent(filter_users(request.GET))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return export_response(request, users.order_by('date_joined', 'pk'), USER_EXPORT_FIELDS, 'users')
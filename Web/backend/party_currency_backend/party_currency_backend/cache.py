@@ -0,0 +1,196 @@
+import logging
+import pickle
+import threading
+import zlib
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache, RedisSerializer
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _CacheUnavailable:
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return 'CACHE_UNAVAILABLE'
+
+
+# Returned by add() when the cache server can't be reached. It is truthy, so a
+# lock taken with `if cache.add(...)` counts as acquired and the caller goes
+# ahead unlocked, instead of waiting on a lock nobody holds. Callers that care
+# compare with `is CACHE_UNAVAILABLE`.
+CACHE_UNAVAILABLE = _CacheUnavailable()
+
+# Values smaller than this are stored uncompressed by CompressedRedisSerializer
+COMPRESS_MIN_BYTES = 1024
+
+
+class CompressedRedisSerializer(RedisSerializer):
+    """
+    Pickle serializer that zlib-compresses larger values, for caches holding
+    big payloads. A leading flag byte tells compressed values apart; integers
+    stay plain so incr()/decr() keep working.
+    """
+
+    def dumps(self, obj):
+        if type(obj) is int:
+            return obj
+        data = pickle.dumps(obj, self.protocol)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return b"z" + zlib.compress(data)
+        return b"p" + data
+
+    def loads(self, data):
+        try:
+            return int(data)
+        except ValueError:
+            pass
+        if data[:1] == b"z":
+            return pickle.loads(zlib.decompress(data[1:]))
+        return pickle.loads(data[1:])
+
+
+class CacheMetrics:
+    """Per-process hit/miss/error counters of a cache alias"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = self.errors = 0
+
+    def record(self, hits=0, misses=0, errors=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.errors += errors
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def get_cache_metrics(cache):
+    """Counters shared by every thread's instance of the same cache configuration"""
+    key = (type(cache).__name__, cache._metrics_location, cache.key_prefix)
+    with _metrics_lock:
+        if key not in _metrics:
+            _metrics[key] = CacheMetrics()
+        return _metrics[key]
+
+
+class MeteredCacheMixin:
+    """
+    Counts hits and misses of get()/get_many() in `self.metrics`. Django builds
+    a cache instance per thread, so the counters live at process level.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._metrics_location = server
+        self.metrics = get_cache_metrics(self)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.metrics.record(misses=1)
+            return default
+        self.metrics.record(hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        self.metrics.record(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+
+class MeteredLocMemCache(MeteredCacheMixin, LocMemCache):
+    """Per-process fallback when no Redis server is configured"""
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class MeteredRedisCache(MeteredCacheMixin, RedisCache):
+    """
+    Django's Redis backend with hit/miss metrics and one connection pool per
+    process, shared by all threads rather than one per thread. Redis being
+    unreachable degrades to cache misses and skipped writes instead of failing
+    the request; add() then returns CACHE_UNAVAILABLE.
+    """
+
+    @cached_property
+    def _cache(self):
+        key = (tuple(self._servers), repr(sorted(self._options.items())))
+        with _clients_lock:
+            if key not in _clients:
+                _clients[key] = self._class(self._servers, **self._options)
+            return _clients[key]
+
+    def _fail_soft(self, operation, default, *args, **kwargs):
+        try:
+            return getattr(super(), operation)(*args, **kwargs)
+        except self._cache._lib.exceptions.RedisError as e:
+            self.metrics.record(errors=1)
+            logger.warning(f"Cache {operation} failed: {e}")
+            return default
+
+    def get(self, key, default=None, version=None):
+        value = self._fail_soft('get', _MISSING, key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        return value
+
+    def get_many(self, keys, version=None):
+        return self._fail_soft('get_many', {}, keys, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._fail_soft('set', None, key, value, timeout=timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._fail_soft('add', CACHE_UNAVAILABLE, key, value, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        return self._fail_soft('delete', False, key, version=version)
+
+    def delete_many(self, keys, version=None):
+        return self._fail_soft('delete_many', None, keys, version=version)
+
+
+class FakeRedisCache(MeteredRedisCache):
+    """
+    MeteredRedisCache on an in-memory fakeredis server shared by the whole
+    process, for tests: same serialization and semantics as Redis, without one.
+    """
+    _server = None
+    _server_lock = threading.Lock()
+
+    def __init__(self, server, params):
+        import fakeredis
+
+        with self._server_lock:
+            if FakeRedisCache._server is None:
+                FakeRedisCache._server = fakeredis.FakeServer()
+        options = dict(params.get('OPTIONS') or {})
+        options.setdefault('connection_class', fakeredis.FakeConnection)
+        options.setdefault('server', FakeRedisCache._server)
+        super().__init__(server or 'redis://fakeredis', {**params, 'OPTIONS': options})
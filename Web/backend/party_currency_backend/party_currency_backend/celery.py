@@ -20,4 +20,8 @@ app.conf.beat_schedule = {
         'task': 'merchant.tasks.check_and_delete_reserved_accounts_task',
         'schedule': crontab(hour=0, minute=0),  # Run daily at midnight
     },
+    'sync-reserved-account-transactions': {
+        'task': 'merchant.tasks.sync_all_reserved_accounts_task',
+        'schedule': crontab(minute='*/10'),  # Run every 10 minutes
+    },
 } 
\ No newline at end of file
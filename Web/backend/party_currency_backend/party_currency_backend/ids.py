@@ -0,0 +1,45 @@
+import secrets
+import string
+from django.db import IntegrityError, router, transaction
+
+ID_ALPHABET = string.ascii_letters + string.digits
+
+# Random characters after the prefix. 62**5 is about 916M IDs, so even with 10M
+# rows taken a fresh ID collides about 1.1% of the time (1.011 attempts on average)
+ID_LENGTH = 5
+
+# Consecutive collisions before giving up; at 10M rows the odds of reaching
+# this are about 1 in 10**15
+MAX_ATTEMPTS = 8
+
+
+def random_id(prefix, length=ID_LENGTH):
+    return prefix + ''.join(secrets.choice(ID_ALPHABET) for _ in range(length))
+
+
+def create_with_unique_id(model, prefix, length=ID_LENGTH, **fields):
+    """
+    Insert a row of `model` whose primary key is a fresh random ID.
+
+    There is no existence check up front: the unique primary key decides. An
+    insert that collides is rolled back to its savepoint and retried with a new
+    ID, so creating a row normally costs a single INSERT however full the
+    keyspace is, and two concurrent requests can never end up with the same ID.
+
+    Raises:
+        IntegrityError: on any other constraint violation, or after MAX_ATTEMPTS collisions
+    """
+    id_field = model._meta.pk.attname
+    using = router.db_for_write(model)
+    for attempt in range(MAX_ATTEMPTS):
+        obj = model(**fields, **{id_field: random_id(prefix, length)})
+        try:
+            with transaction.atomic(using=using):
+                obj.save(force_insert=True, using=using)
+            return obj
+        except IntegrityError:
+            # Only reached on a failed insert; a colliding row has committed by now
+            # because the unique index makes the insert wait for it
+            if not model._default_manager.using(using).filter(pk=obj.pk).exists():
+                raise
+    raise IntegrityError(f"No free {model.__name__} ID after {MAX_ATTEMPTS} attempts")
@@ -0,0 +1,225 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# How cursor pages report the total number of rows
+COUNT_MODES = ('estimate', 'exact', 'none')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    def __init__(self, rows, next_cursor, previous_cursor):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over a queryset.
+
+    Rows are ordered by `ordering` (field or annotation names, "-" prefix for
+    descending) and a page is fetched with a WHERE clause that continues after the
+    last row of the previous page, so every page costs the same however deep the
+    client scrolls. The last ordering key must be unique (usually the primary key)
+    so ties are broken deterministically.
+
+    Cursors are opaque, URL-safe base64 strings holding the ordering values of the
+    row they point at and which way to read from it.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.ordering = [self._resolve_pk(name) for name in ordering]
+        self.page_size = page_size
+
+    @classmethod
+    def for_sort(cls, queryset, sort_fields, page_size):
+        """
+        Paginator for a sort_mapping value (one field or a list of fields), with
+        the primary key appended as the tiebreaker in the same direction.
+        """
+        if isinstance(sort_fields, str):
+            sort_fields = [sort_fields]
+        ordering = list(sort_fields)
+        ordering.append("-pk" if ordering[-1].startswith("-") else "pk")
+        return cls(queryset, ordering, page_size)
+
+    def _resolve_pk(self, name):
+        if name.lstrip("-") != "pk":
+            return name
+        return name.replace("pk", self.model._meta.pk.name)
+
+    def _field(self, name):
+        """Model field behind an ordering key, or None for annotations"""
+        try:
+            return self.model._meta.get_field(name.lstrip("-"))
+        except FieldDoesNotExist:
+            return None
+
+    def encode_cursor(self, obj, reverse=False):
+        values = []
+        for name in self.ordering:
+            field = self._field(name)
+            if field is None:
+                values.append(getattr(obj, name.lstrip("-")))
+            else:
+                values.append(field.value_to_string(obj))
+        payload = json.dumps({"v": values, "r": reverse})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Return (values, reverse) from a cursor"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = payload["v"]
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise InvalidCursor("Invalid cursor")
+            decoded = []
+            for name, value in zip(self.ordering, values):
+                field = self._field(name)
+                decoded.append(value if field is None else field.to_python(value))
+            return decoded, bool(payload.get("r"))
+        except (ValueError, TypeError, KeyError, ValidationError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith("-") else f"-{name}"
+
+    def _after(self, values, ordering):
+        """Filter selecting the rows that sort strictly after `values` in `ordering`"""
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, values):
+            field_name = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{field_name}__{lookup}": value})
+            equal &= Q(**{field_name: value})
+        return condition
+
+    def page(self, cursor=None):
+        """
+        Return the CursorPage that `cursor` points at, or the first page.
+        next_cursor/previous_cursor are None at either end.
+        """
+        values, reverse = self.decode_cursor(cursor) if cursor else (None, False)
+        ordering = [self._flip(name) for name in self.ordering] if reverse else self.ordering
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, ordering))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        if not rows:
+            return CursorPage(rows, None, None)
+        return CursorPage(
+            rows,
+            self.encode_cursor(rows[-1]) if has_next else None,
+            self.encode_cursor(rows[0], reverse=True) if has_previous else None,
+        )
+
+
+def estimate_count(queryset):
+    """
+    Row count of a queryset as estimated by the PostgreSQL planner from table
+    statistics, which is free compared to COUNT(*) on large tables. Falls back to
+    an exact count elsewhere.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan["Plan"]["Plan Rows"])
+
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE, param="page_size"):
+    """page_size query parameter, capped at MAX_PAGE_SIZE. Raises ValueError."""
+    page_size = int(request.GET.get(param, default))
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def uses_page_numbers(request, param="page"):
+    """Legacy clients ask for numbered pages; everyone else gets cursors"""
+    return param in request.GET and "cursor" not in request.GET
+
+
+def uses_cursor(request):
+    """Whether a listing that used to return every row was asked for a page"""
+    return "cursor" in request.GET or "page_size" in request.GET
+
+
+def paginate_cursor(request, queryset, sort_fields, page_size):
+    """
+    Cursor-paginate a listing for a request (`cursor` and `count` parameters).
+
+    Returns:
+        (rows, pagination dict)
+    """
+    count_mode = request.GET.get("count", "estimate")
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"count must be one of: {', '.join(COUNT_MODES)}")
+
+    page = CursorPaginator.for_sort(queryset, sort_fields, page_size).page(request.GET.get("cursor"))
+    pagination = {
+        "page_size": page_size,
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+        "has_next": page.next_cursor is not None,
+        "has_previous": page.previous_cursor is not None,
+    }
+    if count_mode == "estimate":
+        pagination["estimated_total_count"] = estimate_count(queryset)
+    elif count_mode == "exact":
+        pagination["total_count"] = queryset.count()
+    return page.rows, pagination
+
+
+def paginate_page_numbers(queryset, page, page_size):
+    """
+    Numbered pages for existing clients. Out of range pages fall back to the
+    first or last page.
+
+    Returns:
+        (rows, pagination dict)
+    """
+    paginator = Paginator(queryset, page_size)
+    page = paginator.get_page(page)
+    return page.object_list, {
+        "current_page": page.number,
+        "page_size": page_size,
+        "total_pages": paginator.num_pages,
+        "total_count": paginator.count,
+        "has_next": page.has_next(),
+        "has_previous": page.has_previous(),
+        "next_page": page.next_page_number() if page.has_next() else None,
+        "previous_page": page.previous_page_number() if page.has_previous() else None,
+    }
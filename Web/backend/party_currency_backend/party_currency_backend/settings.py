@@ -100,6 +100,50 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Local disk cache for images downloaded from Google Drive
+DRIVE_CACHE_DIR = os.getenv('DRIVE_CACHE_DIR', os.path.join(BASE_DIR, 'drive_cache'))
+DRIVE_CACHE_MAX_BYTES = int(os.getenv('DRIVE_CACHE_MAX_BYTES', 1024 * 1024 * 1024))  # 1 GiB
+DRIVE_CACHE_METADATA_TTL = int(os.getenv('DRIVE_CACHE_METADATA_TTL', 300))  # seconds
+
+# Shared cache for reset codes, throttle counters, token lookups and locks.
+# CACHE_BACKEND is redis (needs REDIS_URL), fakeredis (tests, installed from
+# requirements-dev.txt) or locmem (one process only); it defaults to redis
+# when REDIS_URL is set.
+REDIS_URL = os.getenv('REDIS_URL')
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis' if REDIS_URL else 'locmem')
+CACHE_SERIALIZERS = {
+    'pickle': 'django.core.cache.backends.redis.RedisSerializer',
+    'compressed': 'party_currency_backend.cache.CompressedRedisSerializer',
+}
+CACHE_OPTIONS = {
+    'serializer': CACHE_SERIALIZERS[os.getenv('CACHE_SERIALIZER', 'pickle')],
+    'max_connections': int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),  # per process
+    'socket_connect_timeout': float(os.getenv('REDIS_CONNECT_TIMEOUT', 1)),
+    'socket_timeout': float(os.getenv('REDIS_SOCKET_TIMEOUT', 1)),
+    'health_check_interval': 30,
+}
+CACHE_BACKENDS = {
+    'redis': {
+        'BACKEND': 'party_currency_backend.cache.MeteredRedisCache',
+        'LOCATION': REDIS_URL,
+        'OPTIONS': CACHE_OPTIONS,
+    },
+    'fakeredis': {
+        'BACKEND': 'party_currency_backend.cache.FakeRedisCache',
+        'OPTIONS': {'serializer': CACHE_OPTIONS['serializer']},
+    },
+    'locmem': {
+        'BACKEND': 'party_currency_backend.cache.MeteredLocMemCache',
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'party_currency'),
+        'TIMEOUT': 300,
+    },
+}
+
 
 # Google OAuth2 settings
 SOCIALACCOUNT_PROVIDERS = {
@@ -129,6 +173,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'authentication',
     'testapp',
@@ -195,7 +240,7 @@ DEBUG = True  # Only for debugging on Railway
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'authentication.backends.CachedTokenAuthentication',
         
     ],
     'DEFAULT_PERMISSION_CLASSES': [
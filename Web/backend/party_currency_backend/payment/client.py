@@ -0,0 +1,274 @@
+# client.py
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from .utils import MonnifyAuth, MonnifyTokenManager
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class MonnifyUnavailable(requests.exceptions.ConnectionError):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+class MonnifyAuthError(requests.exceptions.RequestException):
+    """Raised when no access token could be obtained for an authenticated call"""
+
+
+class CircuitBreaker:
+    """
+    Per-process circuit breaker.
+
+    After FAILURE_THRESHOLD consecutive failures the breaker opens and every call
+    fails fast for RESET_TIMEOUT seconds. After that a single trial call is let
+    through; its outcome closes the breaker again or re-opens it.
+    """
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = failure_threshold or self.FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or self.RESET_TIMEOUT
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow_request(self):
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: on average `rate` acquisitions per second, with
+    bursts of up to `capacity`. acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class MonnifyClient:
+    """
+    Shared HTTP client for the Monnify API.
+
+    Keeps one pooled keep-alive `requests.Session` per process, applies a
+    (connect, read) timeout per endpoint, retries idempotent calls on 5xx and
+    connection errors with jittered exponential backoff, and fails fast through
+    a circuit breaker while Monnify is degraded. Errors are raised as
+    `requests.exceptions.RequestException` subclasses, so existing handlers keep
+    working unchanged.
+    """
+    TIMEOUTS = {
+        'auth': (3.05, 10),
+        'init_transaction': (3.05, 20),
+        'query_transaction': (3.05, 10),
+        'reserved_account_transactions': (3.05, 30),
+        'create_reserved_account': (3.05, 30),
+        'delete_reserved_account': (3.05, 20),
+    }
+    DEFAULT_TIMEOUT = (3.05, 30)
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'DELETE'}
+    RETRY_STATUSES = {500, 502, 503, 504}
+    MAX_RETRIES = 3
+    BACKOFF_BASE = 0.25
+    BACKOFF_MAX = 4
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 20
+
+    def __init__(self, breaker=None):
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Sockets must not be shared with a forked child (gunicorn/Celery prefork)
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=0,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+        })
+        return session
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def request(self, method, path, endpoint=None, auth=True, retry=None, headers=None, trial=True, **kwargs):
+        """
+        Send a request to `MONIFY_BASE_URL + path` and return the `requests.Response`.
+
+        Args:
+            endpoint: Key into TIMEOUTS, also used in log messages
+            auth: Attach the cached Monnify bearer token
+            retry: Force retries on or off (defaults to on for idempotent methods)
+            trial: Whether the call may take the half-open breaker's trial slot.
+                Logins pass False: they go through while half-open without
+                taking the slot, and only count towards the breaker when closed.
+        """
+        method = method.upper()
+        url = f"{os.getenv('MONIFY_BASE_URL')}{path}"
+        timeout = kwargs.pop('timeout', self.TIMEOUTS.get(endpoint, self.DEFAULT_TIMEOUT))
+        if retry is None:
+            retry = method in self.IDEMPOTENT_METHODS
+        attempts = self.MAX_RETRIES + 1 if retry else 1
+        request_headers = dict(headers or {})
+        token_refreshed = False
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if auth:
+                # Fetched before taking a breaker slot, as it may log in through this client
+                if self.breaker.state == 'open':
+                    raise MonnifyUnavailable(f"Monnify circuit open, skipping {endpoint or path}")
+                request_headers['Authorization'] = f"Bearer {self._get_token()}"
+
+            counted = self._admit(trial, endpoint or path)
+            try:
+                response = self.session.request(method, url, headers=request_headers, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if counted:
+                    self.breaker.record_failure()
+                if attempt >= attempts:
+                    raise
+                logger.warning(f"Monnify {endpoint or path} attempt {attempt}/{attempts} failed: {e}")
+                self._sleep(attempt)
+                continue
+            except BaseException:
+                # Any other error must still settle the call, or a half-open trial never ends
+                if counted:
+                    self.breaker.record_failure()
+                raise
+
+            if response.status_code in self.RETRY_STATUSES:
+                if counted:
+                    self.breaker.record_failure()
+                if attempt < attempts:
+                    logger.warning(f"Monnify {endpoint or path} attempt {attempt}/{attempts} returned {response.status_code}")
+                    response.close()
+                    self._sleep(attempt)
+                    continue
+                return response
+
+            if counted:
+                self.breaker.record_success()
+
+            if response.status_code == 401 and auth and not token_refreshed:
+                # Token was revoked or expired early; log in again once
+                MonnifyTokenManager.invalidate()
+                token_refreshed = True
+                response.close()
+                attempt -= 1
+                continue
+
+            return response
+
+    def _admit(self, trial, name):
+        """
+        Let a call through the breaker or raise MonnifyUnavailable. Returns
+        whether the call's outcome is to be recorded on the breaker.
+        """
+        if trial:
+            if not self.breaker.allow_request():
+                raise MonnifyUnavailable(f"Monnify circuit open, skipping {name}")
+            return True
+        state = self.breaker.state
+        if state == 'open':
+            raise MonnifyUnavailable(f"Monnify circuit open, skipping {name}")
+        return state == 'closed'
+
+    def _get_token(self):
+        result = MonnifyAuth.get_access_token()
+        if not result or not result.get('success'):
+            raise MonnifyAuthError((result or {}).get('error', 'Failed to get access token'))
+        return result['token']
+
+    def _sleep(self, attempt):
+        # Full jitter keeps a burst of workers from retrying in lockstep
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** (attempt - 1)))
+        time.sleep(random.uniform(0, delay))
+
+
+monnify_client = MonnifyClient()
@@ -0,0 +1,63 @@
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from authentication.backends import invalidate_user_tokens
+from authentication.models import CustomUser
+from payment.models import SpendLedgerEntry
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's total_amount_spent from the spend ledger and report drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Overwrite drifted totals with the ledger total",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=50,
+            help="Drifted users to list (default: 50)",
+        )
+
+    def handle(self, *args, **options):
+        # One GROUP BY pass over the ledger, compared against the stored totals
+        drifted = CustomUser.objects.annotate(
+            ledger_total=Coalesce(
+                Sum('spend_entries__amount'), Value(Decimal('0')), output_field=DecimalField()
+            )
+        ).filter(~Q(total_amount_spent=F('ledger_total'))).values_list(
+            'pk', 'email', 'total_amount_spent', 'ledger_total'
+        ).order_by('pk')
+
+        drifted = list(drifted)
+        total_drift = sum((stored - ledger for _, _, stored, ledger in drifted), Decimal('0'))
+        for _, email, stored, ledger in drifted[:options["limit"]]:
+            self.stdout.write(f"{email}: stored {stored}, ledger {ledger} (drift {stored - ledger})")
+        if len(drifted) > options["limit"]:
+            self.stdout.write(f"... and {len(drifted) - options['limit']} more")
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All spend totals match the ledger"))
+            return
+
+        self.stdout.write(self.style.WARNING(
+            f"{len(drifted)} users have drifted totals (net drift {total_drift})"
+        ))
+        if not options["fix"]:
+            return
+
+        # Recomputed from the ledger inside the UPDATE itself, so payments landing
+        # while this runs are not lost
+        ledger_total = SpendLedgerEntry.objects.filter(
+            user=OuterRef('pk')
+        ).order_by().values('user').annotate(total=Sum('amount')).values('total')
+        drifted_ids = [pk for pk, _, _, _ in drifted]
+        fixed = CustomUser.objects.filter(pk__in=drifted_ids).update(
+            total_amount_spent=Coalesce(Subquery(ledger_total), Value(Decimal('0')), output_field=DecimalField())
+        )
+        invalidate_user_tokens(drifted_ids)
+        self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} users"))
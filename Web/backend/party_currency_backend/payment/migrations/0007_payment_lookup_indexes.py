@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so the tables stay writable during deploys
+    atomic = False
+
+    dependencies = [
+        ('payment', '0006_transaction_breakdown'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['customer_email', 'status'], include=('amount',), name='txn_email_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['event_id'], name='txn_event_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['status', '-created_at'], name='txn_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['-created_at'], name='txn_created_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0007_payment_lookup_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='transaction',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('customer_name', 'customer_email', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('payment_reference', 'transaction_reference', 'event_id', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='txn_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['customer_name'], name='txn_customer_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['customer_email'], name='txn_customer_email_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
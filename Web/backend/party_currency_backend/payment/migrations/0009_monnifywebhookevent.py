@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0008_payment_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonnifyWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_reference', models.CharField(max_length=255)),
+                ('event_type', models.CharField(max_length=100)),
+                ('payment_reference', models.CharField(blank=True, max_length=255)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('received', 'Received'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='received', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('transaction_reference', 'event_type'), name='unique_monnify_webhook_event')],
+            },
+        ),
+    ]
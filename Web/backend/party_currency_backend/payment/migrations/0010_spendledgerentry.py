@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0009_monnifywebhookevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entry', to='payment.transaction')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='spend_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
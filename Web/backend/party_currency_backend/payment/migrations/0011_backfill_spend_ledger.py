@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_customuser_search_indexes'),
+        ('payment', '0010_spendledgerentry'),
+    ]
+
+    operations = [
+        # One ledger entry per successful transaction paid so far, dated by the payment
+        migrations.RunSQL(
+            """
+            INSERT INTO payment_spendledgerentry (transaction_id, user_id, amount, created_at)
+            SELECT t.id, u.id, t.amount, t.updated_at
+            FROM payment_transaction t
+            LEFT JOIN custom_user u ON u.email = t.user_id
+            WHERE t.status = 'successful'
+              AND NOT EXISTS (
+                  SELECT 1 FROM payment_spendledgerentry l WHERE l.transaction_id = t.id
+              )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,5 +1,8 @@
 # models.py
+from django.conf import settings
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 
 class Transaction(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -17,4 +20,83 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     redirect_url = models.URLField(blank=True)
-    breakdown = models.CharField(max_length=555, default="")
\ No newline at end of file
+    breakdown = models.CharField(max_length=555, default="")
+    # Full-text document for the admin search, kept up to date by PostgreSQL
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('customer_name', 'customer_email', weight='A', config='simple')
+            + SearchVector('payment_reference', 'transaction_reference', 'event_id', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # A user's transactions, and their successful spend as an index-only scan
+            models.Index(fields=['customer_email', 'status'], include=['amount'], name='txn_email_status_idx'),
+            # Transaction of an event
+            models.Index(fields=['event_id'], name='txn_event_idx'),
+            # Admin transaction listing filtered by status, newest first
+            models.Index(fields=['status', '-created_at'], name='txn_status_created_idx'),
+            # Admin listing of all statuses and the dashboard weekly counts
+            models.Index(fields=['-created_at'], name='txn_created_idx'),
+            # Admin search: full text plus fuzzy matching on the customer
+            GinIndex(fields=['search_vector'], name='txn_search_vector_idx'),
+            GinIndex(fields=['customer_name'], opclasses=['gin_trgm_ops'], name='txn_customer_name_trgm_idx'),
+            GinIndex(fields=['customer_email'], opclasses=['gin_trgm_ops'], name='txn_customer_email_trgm_idx'),
+        ]
+
+
+class MonnifyWebhookEvent(models.Model):
+    """
+    Every webhook notification received from Monnify, stored before it is acted on.
+    The unique (transaction_reference, event_type) pair makes redelivered
+    notifications no-ops.
+    """
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    transaction_reference = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100)
+    payment_reference = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['transaction_reference', 'event_type'], name='unique_monnify_webhook_event'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} - {self.transaction_reference}"
+
+
+class SpendLedgerEntry(models.Model):
+    """
+    Append-only record of money a user has spent, one entry per successful
+    transaction. CustomUser.total_amount_spent is a running total of these entries,
+    kept in step with F() increments and checked by `manage.py recompute_spend_totals`.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL, related_name='spend_entries'
+    )
+    transaction = models.OneToOneField(Transaction, on_delete=models.PROTECT, related_name='ledger_entry')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Spend ledger entries are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.amount}"
@@ -0,0 +1,87 @@
+import os
+import secrets
+import threading
+import time
+
+# Crockford base32: no I, L, O or U, and in ASCII order so references sort by time
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+PREFIX = 'party'
+TIMESTAMP_CHARS = 10  # milliseconds since the epoch, 50 bits
+WORKER_CHARS = 4      # 20 bit worker ID
+SEQUENCE_CHARS = 4    # 20 bit counter within one millisecond
+
+WORKER_BITS = WORKER_CHARS * 5
+SEQUENCE_BITS = SEQUENCE_CHARS * 5
+
+
+def encode_base32(value, length):
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+class PaymentReferenceGenerator:
+    """
+    Snowflake-style payment references: a millisecond timestamp, a worker ID and
+    a per-millisecond sequence, Crockford base32 encoded at fixed width, e.g.
+    "party01JAB3K7QZ4F9C0000".
+
+    References from one process are strictly increasing, even if the clock steps
+    back, and sort by creation time across processes. Each process picks its
+    worker ID from PAYMENT_REFERENCE_WORKER_ID, or at random (again after a fork),
+    so workers don't need to coordinate; the unique constraint on
+    payment_reference stays as the final guard.
+    """
+
+    def __init__(self, worker_id=None):
+        self._fixed_worker_id = worker_id
+        self._worker_id = None
+        self._pid = None
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        # A forked child (gunicorn/Celery prefork) must not reuse its parent's ID
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        worker_id = self._fixed_worker_id
+        if worker_id is None and os.getenv('PAYMENT_REFERENCE_WORKER_ID'):
+            worker_id = int(os.getenv('PAYMENT_REFERENCE_WORKER_ID'))
+        if worker_id is None:
+            worker_id = secrets.randbits(WORKER_BITS)
+        self._worker_id = worker_id % (1 << WORKER_BITS)
+        self._pid = pid
+        self._last_ms = -1
+        self._sequence = 0
+
+    def generate(self):
+        with self._lock:
+            self._ensure_worker()
+            now_ms = max(time.time_ns() // 1_000_000, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence += 1
+                if self._sequence >> SEQUENCE_BITS:
+                    # Sequence exhausted for this millisecond: borrow the next one
+                    now_ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (
+                PREFIX
+                + encode_base32(now_ms, TIMESTAMP_CHARS)
+                + encode_base32(self._worker_id, WORKER_CHARS)
+                + encode_base32(self._sequence, SEQUENCE_CHARS)
+            )
+
+
+payment_references = PaymentReferenceGenerator()
+
+
+def new_payment_reference():
+    return payment_references.generate()
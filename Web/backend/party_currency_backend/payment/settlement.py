@@ -0,0 +1,134 @@
+import logging
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from authentication.backends import invalidate_user_tokens
+from authentication.models import CustomUser
+from events.models import Events
+from merchant.utils import build_reserved_account_transaction, upsert_reserved_account_transactions
+from party_currency_admin.utils import invalidate_admin_statistics
+from .models import Transaction, MonnifyWebhookEvent, SpendLedgerEntry
+
+logger = logging.getLogger(__name__)
+
+# Monnify paymentStatus values meaning the customer will not pay this reference
+FAILED_PAYMENT_STATUSES = {'FAILED', 'CANCELLED', 'EXPIRED', 'REVERSED'}
+PAID_PAYMENT_STATUSES = {'PAID', 'OVERPAID'}
+
+
+def record_spend(transaction):
+    """
+    Append the ledger entry for a successful transaction and add it to the
+    user's running total with an atomic increment, so concurrent payments never
+    overwrite each other and the rest of the user row is left alone.
+    Must run inside the transaction that marked it successful.
+    """
+    user_id = CustomUser.objects.filter(email=transaction.user_id).values_list('pk', flat=True).first()
+    SpendLedgerEntry.objects.create(user_id=user_id, transaction=transaction, amount=transaction.amount)
+    if user_id is not None:
+        CustomUser.objects.filter(pk=user_id).update(
+            total_amount_spent=F('total_amount_spent') + transaction.amount
+        )
+        # Cached request.user copies still hold the old total
+        db_transaction.on_commit(lambda: invalidate_user_tokens([user_id]))
+
+
+def settle_transaction(payment_reference, paid, transaction_reference=None):
+    """
+    Apply the outcome of a payment exactly once, whoever reports it first (the
+    browser callback or the Monnify webhook).
+
+    The status change is a conditional UPDATE: a pending (or, for a late
+    payment, failed) transaction moves to its new status, and only the caller
+    whose UPDATE matched goes on to update the event and record the spend.
+    A successful transaction never changes again.
+
+    Returns:
+        bool: True if this call changed the transaction
+    """
+    new_status = 'successful' if paid else 'failed'
+    settle_from = ['pending', 'failed'] if paid else ['pending']
+    changes = {'status': new_status, 'updated_at': timezone.now()}
+    if transaction_reference:
+        changes['transaction_reference'] = transaction_reference
+
+    with db_transaction.atomic():
+        updated = Transaction.objects.filter(
+            payment_reference=payment_reference,
+            status__in=settle_from,
+        ).update(**changes)
+        if not updated:
+            return False
+
+        transaction = Transaction.objects.get(payment_reference=payment_reference)
+        if transaction.event_id:
+            event_changes = {'transaction_id': payment_reference, 'payment_status': new_status}
+            if paid:
+                event_changes['delivery_status'] = 'pending'
+            Events.objects.filter(event_id=transaction.event_id).update(**event_changes)
+
+        if paid:
+            record_spend(transaction)
+
+    logger.info(f"Transaction {payment_reference} settled as {new_status}")
+    invalidate_admin_statistics()
+    return True
+
+
+def record_webhook_event(payload):
+    """
+    Store a webhook notification. Returns the new MonnifyWebhookEvent, or None
+    if the same event was already received.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Webhook payload must be a JSON object")
+    event_data = payload.get('eventData') or {}
+    transaction_reference = event_data.get('transactionReference')
+    if not transaction_reference:
+        raise ValueError("Webhook payload has no transactionReference")
+
+    event, created = MonnifyWebhookEvent.objects.get_or_create(
+        transaction_reference=transaction_reference,
+        event_type=payload.get('eventType', ''),
+        defaults={
+            'payment_reference': event_data.get('paymentReference') or '',
+            'payload': payload,
+        },
+    )
+    return event if created else None
+
+
+def process_webhook_event(event):
+    """
+    Act on a stored webhook notification and record the outcome on it.
+    Reserved account transfers go to the merchant's transaction mirror rather
+    than to payments.
+    """
+    event_data = event.payload.get('eventData') or {}
+    product_type = (event_data.get('product') or {}).get('type')
+    payment_status = (event_data.get('paymentStatus') or '').upper()
+
+    if product_type == 'RESERVED_ACCOUNT':
+        # Stored without moving the sync high-water mark, so the next sync
+        # still picks up anything older that was missed
+        account_reference = (event_data.get('product') or {}).get('reference')
+        if not account_reference or not event_data.get('transactionReference'):
+            outcome = 'ignored'
+        else:
+            upsert_reserved_account_transactions(
+                [build_reserved_account_transaction(account_reference, event_data)]
+            )
+            outcome = 'processed'
+    elif event.event_type == 'SUCCESSFUL_TRANSACTION' or payment_status in PAID_PAYMENT_STATUSES:
+        settle_transaction(event.payment_reference, paid=True, transaction_reference=event.transaction_reference)
+        outcome = 'processed'
+    elif payment_status in FAILED_PAYMENT_STATUSES:
+        settle_transaction(event.payment_reference, paid=False, transaction_reference=event.transaction_reference)
+        outcome = 'processed'
+    else:
+        outcome = 'ignored'
+
+    MonnifyWebhookEvent.objects.filter(pk=event.pk).update(
+        status=outcome, error='', processed_at=timezone.now()
+    )
+    return outcome
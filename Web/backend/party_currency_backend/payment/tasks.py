@@ -0,0 +1,33 @@
+import logging
+from celery import shared_task
+from django.db.models import F
+from .models import MonnifyWebhookEvent
+from .settlement import process_webhook_event
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def process_monnify_webhook_task(self, event_id):
+    """
+    Apply a stored Monnify webhook notification. Safe to run more than once:
+    processed events are skipped and settlement itself is idempotent.
+    """
+    try:
+        event = MonnifyWebhookEvent.objects.get(pk=event_id)
+    except MonnifyWebhookEvent.DoesNotExist:
+        logger.error(f"Monnify webhook event {event_id} not found")
+        return None
+    if event.status in ('processed', 'ignored'):
+        return event.status
+
+    MonnifyWebhookEvent.objects.filter(pk=event_id).update(attempts=F('attempts') + 1)
+    try:
+        return process_webhook_event(event)
+    except Exception as e:
+        logger.error(f"Processing Monnify webhook {event} failed: {e}")
+        if self.request.retries < self.max_retries:
+            MonnifyWebhookEvent.objects.filter(pk=event_id).update(error=str(e))
+            raise self.retry(exc=e)
+        MonnifyWebhookEvent.objects.filter(pk=event_id).update(status='failed', error=str(e))
+        raise
@@ -1,3 +1,178 @@
-from django.test import TestCase
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest import mock, skipUnless
+import requests
+from django.db import connection, connections
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from events.models import Events
+from party_currency_backend.cache import MeteredRedisCache
+from party_currency_backend.testing import IndexPlanTestMixin
+from .client import CircuitBreaker, MonnifyAuthError, MonnifyClient
+from .models import Transaction
+from .references import PaymentReferenceGenerator
+from .utils import MonnifyTokenManager
 
 # Create your tests here.
+
+
+@skipUnless(connection.vendor == 'postgresql', "EXPLAIN plans are PostgreSQL specific")
+class TransactionIndexTests(IndexPlanTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Most transactions succeed, so only the email leads to a few rows
+        Transaction.objects.bulk_create([
+            Transaction(
+                amount=1000,
+                customer_email=f"user{i % 500}@example.com",
+                event_id=f"EVT{i:05d}",
+                payment_reference=f"party{i}",
+                transaction_reference=f"MNFY{i}",
+                status='pending' if i % 20 == 0 else 'failed' if i % 20 == 1 else 'successful',
+            )
+            for i in range(5000)
+        ])
+        cls.analyze(Transaction)
+
+    def test_transactions_of_user(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(customer_email="user7@example.com"),
+            "txn_email_status_idx",
+        )
+
+    def test_successful_spend_of_user(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(customer_email="user7@example.com", status='successful')
+            .values('customer_email').annotate(total=Sum('amount')),
+            "txn_email_status_idx",
+        )
+
+    def test_transaction_of_event(self):
+        self.assertUsesIndex(Transaction.objects.filter(event_id="EVT00042"), "txn_event_idx")
+
+    def test_transactions_by_status(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(status='pending').order_by('-created_at'),
+            "txn_status_created_idx",
+        )
+
+
+class PaymentReferenceTests(TestCase):
+    def test_unique_and_ordered_across_threads(self):
+        generator = PaymentReferenceGenerator()
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            batches = list(pool.map(lambda _: [generator.generate() for _ in range(2000)], range(16)))
+        references = [reference for batch in batches for reference in batch]
+        self.assertEqual(len(set(references)), len(references))
+        for batch in batches:
+            self.assertEqual(batch, sorted(batch))
+        self.assertRegex(references[0], r"^party[0-9A-HJKMNP-TV-Z]{18}$")
+
+    def test_monotonic_when_clock_steps_back(self):
+        generator = PaymentReferenceGenerator()
+        with mock.patch('payment.references.time.time_ns', return_value=2_000_000_000_000_000_000):
+            first = generator.generate()
+        with mock.patch('payment.references.time.time_ns', return_value=1_000_000_000_000_000_000):
+            second = generator.generate()
+        self.assertLess(first, second)
+
+    def test_sequence_overflow_moves_to_next_millisecond(self):
+        generator = PaymentReferenceGenerator(worker_id=1)
+        with mock.patch('payment.references.time.time_ns', return_value=1_700_000_000_000_000_000):
+            generator.generate()
+            generator._sequence = (1 << 20) - 1
+            reference = generator.generate()
+        self.assertEqual(generator._last_ms, 1_700_000_000_001)
+        self.assertTrue(reference.endswith("0000"))
+
+    def test_forked_process_picks_new_worker(self):
+        generator = PaymentReferenceGenerator()
+        generator.generate()
+        with mock.patch('payment.references.os.getpid', return_value=-1), \
+                mock.patch('payment.references.secrets.randbits', return_value=12345):
+            generator.generate()
+        self.assertEqual(generator._worker_id, 12345)
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.client = MonnifyClient(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.01))
+        self.ok = mock.Mock(status_code=200)
+
+    def open_breaker(self):
+        with mock.patch.object(self.client.session, 'request', side_effect=requests.exceptions.ConnectionError):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.client.get('/x', auth=False, retry=False)
+        time.sleep(0.02)
+        self.assertEqual(self.client.breaker.state, 'half-open')
+
+    def test_failed_token_fetch_does_not_hold_the_trial(self):
+        self.open_breaker()
+        with mock.patch('payment.client.MonnifyAuth.get_access_token', return_value={'success': False}):
+            with self.assertRaises(MonnifyAuthError):
+                self.client.get('/x')
+        with mock.patch.object(self.client.session, 'request', return_value=self.ok):
+            self.assertIs(self.client.get('/x', auth=False), self.ok)
+        self.assertEqual(self.client.breaker.state, 'closed')
+
+    def test_unexpected_error_ends_the_trial(self):
+        self.open_breaker()
+        with mock.patch.object(self.client.session, 'request', side_effect=requests.exceptions.InvalidURL):
+            with self.assertRaises(requests.exceptions.InvalidURL):
+                self.client.get('/x', auth=False)
+        time.sleep(0.02)
+        with mock.patch.object(self.client.session, 'request', return_value=self.ok):
+            self.assertIs(self.client.get('/x', auth=False), self.ok)
+
+    def test_login_does_not_take_the_trial(self):
+        self.open_breaker()
+        with mock.patch.object(self.client.session, 'request', return_value=self.ok):
+            self.client.post('/auth/login', auth=False, trial=False)
+            self.assertEqual(self.client.breaker.state, 'half-open')
+            self.client.get('/x', auth=False)
+        self.assertEqual(self.client.breaker.state, 'closed')
+
+
+class TokenManagerCacheDownTests(TestCase):
+    def test_logs_in_without_waiting_when_cache_is_down(self):
+        unreachable = MeteredRedisCache('redis://127.0.0.1:1', {'OPTIONS': {'socket_connect_timeout': 0.1}})
+        login = {'success': True, 'token': 'abc', 'expires_in': 3600}
+        with mock.patch('payment.utils.cache', unreachable), \
+                mock.patch('payment.utils.MonnifyAuth.login', return_value=login) as mocked_login, \
+                self.assertLogs('party_currency_backend.cache', 'WARNING'):
+            started = time.monotonic()
+            result = MonnifyTokenManager.get_access_token()
+        self.assertLess(time.monotonic() - started, MonnifyTokenManager.LOCK_WAIT_SECONDS)
+        self.assertEqual(result['token'], 'abc')
+        mocked_login.assert_called_once()
+
+
+@skipUnless(connection.vendor == 'postgresql', "Concurrent writes need a server database")
+class ConcurrentCheckoutTests(TransactionTestCase):
+    def test_concurrent_checkouts_get_distinct_references(self):
+        checkouts = 200
+        user = CustomUser.objects.create_user(username="buyer", email="buyer@example.com", password="pass")
+        Events.objects.create(
+            event_id="EVT00001", event_name="Party", start_date=date.today(),
+            end_date=date.today(), delivery_address="Lagos",
+        )
+
+        def checkout(_):
+            try:
+                client = APIClient()
+                client.force_authenticate(user)
+                return client.post("/payments/create-transaction", {"event_id": "EVT00001"}, format="json")
+            finally:
+                connections.close_all()
+
+        with mock.patch.dict(os.environ, {"MONIFY_CONTRACT_CODE": "TEST"}), ThreadPoolExecutor(max_workers=16) as pool:
+            responses = list(pool.map(checkout, range(checkouts)))
+
+        self.assertEqual([response.status_code for response in responses], [200] * checkouts)
+        references = [response.data["payment_reference"] for response in responses]
+        self.assertEqual(len(set(references)), checkouts)
+        self.assertEqual(Transaction.objects.count(), checkouts)
@@ -1,7 +1,12 @@
 # utils.py
 import base64
+import hashlib
+import hmac
+import threading
+import time
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from dotenv import load_dotenv
 import os
 
@@ -21,17 +26,41 @@ class MonnifyAuth:
         encoded_auth = base64.b64encode(auth_string.encode()).decode()
         return f"Basic {encoded_auth}"
 
+    @staticmethod
+    def verify_webhook_signature(body, signature):
+        """
+        Check the `monnify-signature` header of a webhook: the hex HMAC-SHA512 of
+        the raw request body keyed with the client secret.
+        """
+        secret_key = os.getenv('MONIFY_SECRET_KEY')
+        if not secret_key or not signature:
+            return False
+        expected = hmac.new(secret_key.encode(), body, hashlib.sha512).hexdigest()
+        return hmac.compare_digest(expected, signature.strip().lower())
+
     @staticmethod
     def get_access_token():
-        """Get access token from Monnify API"""
+        """Get a (cached) access token for the Monnify API"""
+        return MonnifyTokenManager.get_access_token()
+
+    @staticmethod
+    def login():
+        """Log in to Monnify and return a fresh access token"""
         headers = {
             'Authorization': MonnifyAuth.generate_basic_auth(),
             'Content-Type': 'application/json'
         }
         
+        # Imported here because the client itself depends on MonnifyAuth
+        from .client import monnify_client
+
         try:
-            response = requests.post(
-                f"{os.getenv('MONIFY_BASE_URL')}/auth/login",
+            response = monnify_client.post(
+                "/auth/login",
+                endpoint='auth',
+                auth=False,
+                retry=True,
+                trial=False,
                 headers=headers,
                 json={}
             )
@@ -56,4 +85,142 @@ class MonnifyAuth:
                 'success': False,
                 'error': str(e)
             }
+
+
+class MonnifyTokenManager:
+    """
+    Shares one Monnify access token between all workers through the Django cache.
+
+    Tokens are stored per set of credentials and dropped EXPIRY_MARGIN_SECONDS
+    before Monnify's `expiresIn`. Once a token enters the last
+    REFRESH_AHEAD_SECONDS of its life, the first caller to take the refresh lock
+    logs in again while everyone else keeps using the current token, so a burst
+    of requests only ever triggers a single login.
+    """
+    CACHE_PREFIX = "monnify_token_"
+    LOCK_PREFIX = "monnify_token_lock_"
+    EXPIRY_MARGIN_SECONDS = 60
+    REFRESH_AHEAD_SECONDS = 300
+    LOCK_TIMEOUT_SECONDS = 15
+    LOCK_WAIT_SECONDS = 5
+    LOCK_POLL_SECONDS = 0.05
+
+    _stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+    _stats_lock = threading.Lock()
+
+    @classmethod
+    def get_access_token(cls):
+        """
+        Return a token in the same shape as `MonnifyAuth.login()`, logging in only
+        when there is no usable cached token.
+        """
+        key = cls._cache_key()
+        entry = cache.get(key)
+        now = time.time()
+
+        if entry and now < entry['expires_at'] - cls.REFRESH_AHEAD_SECONDS:
+            cls._count('hits')
+            return cls._as_result(entry, now)
+
+        if entry and now < entry['expires_at']:
+            # Still valid: refresh in the foreground only if nobody else is already doing it
+            cls._count('hits')
+            if cls._acquire_lock(key):
+                try:
+                    refreshed = cls._refresh(key)
+                finally:
+                    cls._release_lock(key)
+                if refreshed:
+                    return cls._as_result(refreshed, time.time())
+            return cls._as_result(entry, now)
+
+        cls._count('misses')
+        deadline = now + cls.LOCK_WAIT_SECONDS
+        while not cls._acquire_lock(key):
+            # Another worker is logging in; pick up its token as soon as it lands
+            entry = cache.get(key)
+            if entry and time.time() < entry['expires_at']:
+                return cls._as_result(entry, time.time())
+            if time.time() >= deadline:
+                break
+            time.sleep(cls.LOCK_POLL_SECONDS)
+        else:
+            try:
+                entry = cache.get(key)
+                if entry and time.time() < entry['expires_at']:
+                    return cls._as_result(entry, time.time())
+                return cls._login_result(key)
+            finally:
+                cls._release_lock(key)
+
+        # Lock holder is taking too long; don't block the request on it
+        return cls._login_result(key)
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the cached token, e.g. after Monnify rejects it with a 401"""
+        cache.delete(cls._cache_key())
+
+    @classmethod
+    def stats(cls):
+        """Return this process' hit/miss/refresh/error counters"""
+        with cls._stats_lock:
+            return dict(cls._stats)
+
+    @classmethod
+    def _refresh(cls, key):
+        result = MonnifyAuth.login()
+        if not result.get('success'):
+            cls._count('errors')
+            return None
+        cls._count('refreshes')
+        return cls._store(key, result)
+
+    @classmethod
+    def _login_result(cls, key):
+        result = MonnifyAuth.login()
+        if not result.get('success'):
+            cls._count('errors')
+            return result
+        cls._count('refreshes')
+        return cls._as_result(cls._store(key, result), time.time())
+
+    @classmethod
+    def _store(cls, key, result):
+        lifetime = max(int(result['expires_in']) - cls.EXPIRY_MARGIN_SECONDS, 1)
+        entry = {'token': result['token'], 'expires_at': time.time() + lifetime}
+        cache.set(key, entry, timeout=lifetime)
+        return entry
+
+    @staticmethod
+    def _as_result(entry, now):
+        return {
+            'success': True,
+            'token': entry['token'],
+            'expires_in': max(int(entry['expires_at'] - now), 0)
+        }
+
+    @classmethod
+    def _cache_key(cls):
+        credentials = ":".join([
+            os.getenv('MONIFY_BASE_URL') or '',
+            os.getenv('MONIFY_API_KEY') or '',
+            os.getenv('MONIFY_SECRET_KEY') or '',
+        ])
+        return cls.CACHE_PREFIX + hashlib.sha256(credentials.encode()).hexdigest()[:32]
+
+    @classmethod
+    def _acquire_lock(cls, key):
+        # CACHE_UNAVAILABLE (truthy) when the cache is down: nobody can hold the
+        # lock, so the caller logs in straight away rather than waiting on it
+        return cache.add(cls.LOCK_PREFIX + key, 1, timeout=cls.LOCK_TIMEOUT_SECONDS)
+
+    @classmethod
+    def _release_lock(cls, key):
+        cache.delete(cls.LOCK_PREFIX + key)
+
+    @classmethod
+    def _count(cls, name):
+        with cls._stats_lock:
+            cls._stats[name] += 1
 # payment/admin.py
\ No newline at end of file
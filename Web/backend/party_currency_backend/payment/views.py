@@ -5,16 +5,20 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
 from .serializers import TransactionSerializer
-from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
 from .models import Transaction
 from events.models import Events
-import time
 import os
 from dotenv import load_dotenv
+from .client import monnify_client
+from .references import new_payment_reference
+from .settlement import settle_transaction, record_webhook_event
+from .tasks import process_monnify_webhook_task
 from .utils import MonnifyAuth
+from django.db import transaction as db_transaction
+import json
 from rest_framework.permissions import AllowAny
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
-from authentication.models import CustomUser as CUser
 from django.http import HttpResponseRedirect
 
 class UserThrottle(UserRateThrottle):
@@ -27,11 +31,6 @@ class InitializeTransactionView(APIView):
         transaction = Transaction.objects.get(payment_reference=request.data['payment_reference'])
         
             # Prepare the request to Monnify API
-        headers = {
-                'Authorization': f"Bearer {MonnifyAuth.get_access_token()['token']}",
-                'Content-Type': 'application/json'
-            }
-        print(headers)
         payload = {
                 'amount': float(transaction.amount),
                 'customerName': transaction.customer_name,
@@ -45,10 +44,10 @@ class InitializeTransactionView(APIView):
             }
 
         try:
-            response = requests.post(
-                    f"{os.getenv('MONIFY_BASE_URL')}/merchant/transactions/init-transaction",
-                    json=payload,
-                    headers=headers
+            response = monnify_client.post(
+                    "/merchant/transactions/init-transaction",
+                    endpoint='init_transaction',
+                    json=payload
                 )
 
             response_data = response.json()
@@ -91,7 +90,7 @@ def generate_transcation_ID(request):
         amount=sum(amount.values()),    
         customer_name=f"{request.user.first_name} {request.user.last_name}",
         customer_email=request.user.email,
-        payment_reference=f"party{int(time.time())}",
+        payment_reference=new_payment_reference(),
         payment_description=f"Payment for {request.data['event_id']}",
         currency_code="NGN",
         breakdown=str(amount),
@@ -122,59 +121,29 @@ def callback(request):
         transaction = Transaction.objects.get(payment_reference=payment_reference)
         transaction_reference = transaction.transaction_reference
         
-        # Verify with Monnify
-        headers = {
-            'Authorization': f"Bearer {MonnifyAuth.get_access_token()['token']}",
-            'Content-Type': 'application/json'
-        }
+        # The webhook may already have settled the payment
+        if transaction.status == "successful":
+            return HttpResponseRedirect(f"{frontend_url}/dashboard?transaction_reference={transaction_reference}")
         
-        verification_response = requests.get(
-            f"{os.getenv('MONIFY_BASE_URL')}/merchant/transactions/query?paymentReference={payment_reference}",
-            headers=headers
+        # Verify with Monnify
+        verification_response = monnify_client.get(
+            "/merchant/transactions/query",
+            endpoint='query_transaction',
+            params={'paymentReference': payment_reference}
         )
         
         verification_data = verification_response.json()
         
         if verification_data.get('requestSuccessful') and verification_data['responseBody'].get('paymentStatus') == "PAID":
-           
-            transaction.status = "successful"
-            transaction.save()
-            
-            # Update event
-            if transaction.event_id:
-                try:
-                    event = Events.objects.get(event_id=transaction.event_id)
-                    event.transaction_id = payment_reference
-                    event.payment_status = 'successful'
-                    event.delivery_status = 'pending'
-                    event.save()
-                except Events.DoesNotExist:
-                    pass  # Continue even if event not found
-            
-            # Update user total
-            try:
-                user = CUser.objects.get(email=transaction.user_id)
-                user.total_amount_spent = user.total_amount_spent + transaction.amount
-                user.save()
-            except (CUser.DoesNotExist, Exception) as e:
-                print(f"Error updating user total: {str(e)}")
+            # Updates the transaction, event and user total unless the webhook already did
+            settle_transaction(payment_reference, paid=True)
             
             redirect_url = f"{frontend_url}/dashboard?transaction_reference={transaction_reference}"
             return HttpResponseRedirect(redirect_url)
             
         else:
             # Payment failed
-            transaction.status = "failed"
-            transaction.save()
-            
-            if transaction.event_id:
-                try:
-                    event = Events.objects.get(event_id=transaction.event_id)
-                    event.transaction_id = payment_reference
-                    event.payment_status = 'failed'
-                    event.save()
-                except Events.DoesNotExist:
-                    pass
+            settle_transaction(payment_reference, paid=False)
             
             redirect_url = f"{frontend_url}/dashboard?transaction_reference={transaction_reference}&status=failed"
             return HttpResponseRedirect(redirect_url)
@@ -190,4 +159,30 @@ def callback(request):
             error_redirect += f"?transaction_reference={transaction_reference}&error=processing_failed"
         else:
             error_redirect += "?error=processing_failed"
-        return HttpResponseRedirect(error_redirect)
\ No newline at end of file
+        return HttpResponseRedirect(error_redirect)
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([])
+def monnify_webhook(request):
+    """
+    Receive Monnify webhook notifications. The signature is checked against the
+    raw body, the notification is stored once per transaction reference and
+    event type, and it is applied by a Celery worker after this returns.
+    """
+    body = request.body
+    if not MonnifyAuth.verify_webhook_signature(body, request.headers.get("monnify-signature")):
+        return Response({"error": "Invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    try:
+        payload = json.loads(body)
+        with db_transaction.atomic():
+            event = record_webhook_event(payload)
+            if event is not None:
+                db_transaction.on_commit(lambda: process_monnify_webhook_task.delay(event.pk))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({"status": "received" if event is not None else "duplicate"}, status=status.HTTP_200_OK)
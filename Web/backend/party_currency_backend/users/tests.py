@@ -1,3 +1,41 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from payment.models import Transaction
 
 # Create your tests here.
+
+
+class UserTransactionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="ada@example.com", email="ada@example.com", password="password1")
+        Transaction.objects.bulk_create([
+            Transaction(
+                amount=1000,
+                customer_email=cls.user.email,
+                event_id=f"EVT{i:05d}",
+                payment_reference=f"party{i}",
+                status='successful',
+            )
+            for i in range(25)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_all_transactions_without_pagination_parameters(self):
+        response = self.client.get(reverse("get_user_transactions"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['transactions']), 25)
+        self.assertNotIn('pagination', response.data)
+
+    def test_cursor_pages_when_asked(self):
+        url = reverse("get_user_transactions")
+        response = self.client.get(url, {'page_size': 20, 'count': 'none'})
+        self.assertEqual(len(response.data['transactions']), 20)
+        response = self.client.get(url, {'cursor': response.data['pagination']['next_cursor'], 'page_size': 20, 'count': 'none'})
+        self.assertEqual(len(response.data['transactions']), 5)
+        self.assertFalse(response.data['pagination']['has_next'])
@@ -2,18 +2,18 @@
 from django.shortcuts import render
 from  rest_framework.decorators import api_view,authentication_classes,permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication,SessionAuthentication
+from rest_framework.authentication import SessionAuthentication
+from authentication.backends import CachedTokenAuthentication
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from google_drive.models import GoogleDriveFile
-from google_drive.utils import upload_file_to_drive
+from google_drive.utils import upload_fileobj_to_drive
 from authentication.models import CustomUser
-from django.core.files.storage import default_storage
 import os
-from django.core.files.base import ContentFile
 from rest_framework import status
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 from payment.serializers import TransactionSerializer
 from payment.models import Transaction
+from party_currency_backend.pagination import get_page_size, paginate_cursor, uses_cursor
 
 # Add these classes for custom throttling
 class UserThrottle(UserRateThrottle):
@@ -27,7 +27,7 @@ class AnonThrottle(AnonRateThrottle):
 @api_view(["GET"])
 @throttle_classes([UserThrottle])
 @permission_classes([IsAuthenticated])
-@authentication_classes([SessionAuthentication,TokenAuthentication])
+@authentication_classes([SessionAuthentication,CachedTokenAuthentication])
 def fetchUser(request):
     user=request.user
     if (user.type == "user"):
@@ -109,10 +109,12 @@ def edit_user(request):
         
         # Update user fields
         updated_fields = []
+        model_fields = []
         for request_field, model_field in field_mapping.items():
             if request_field in request.data:
                 setattr(user, model_field, request.data[request_field])
                 updated_fields.append(request_field)
+                model_fields.append(model_field)
         
         # Handle merchant-specific fields
         if user.type == "merchant":
@@ -120,10 +122,12 @@ def edit_user(request):
                 if field in request.data:
                     setattr(user, field, request.data[field])
                     updated_fields.append(field)
+                    model_fields.append(field)
         
-        # Save changes only if fields were updated
+        # Save changes only if fields were updated; only the changed columns are
+        # written, so totals updated elsewhere in the meantime are kept
         if updated_fields:
-            user.save()
+            user.save(update_fields=model_fields)
             return Response({
                 "message": "Profile updated successfully",
                 "updated_fields": updated_fields
@@ -148,17 +152,13 @@ def upload_picture(request):
         return Response({"error": "No profile picture provided"}, status=status.HTTP_400_BAD_REQUEST)
     try:
         profile_picture = request.FILES['profile_picture']
-        # Save the file temporarily
         file_name = f"{user.email}_profile_picture{os.path.splitext(profile_picture.name)[1]}"
-        file_path = default_storage.save(f'tmp/{file_name}', ContentFile(profile_picture.read()))
-        # Upload the file to Google Drive
+        # Stream the upload straight to Google Drive
         folder_id = '1xg-UFjBtNMUeX3RbLsyOsBsmDOJzj2Sk'  # Replace with your folder ID
-        file_id = upload_file_to_drive(file_path, file_name, folder_id)
+        file_id = upload_fileobj_to_drive(profile_picture, file_name, folder_id)
         # Update the user's profile picture field
         user.profile_picture = file_id
-        user.save()
-        # Clean up the temporary file
-        default_storage.delete(file_path)
+        user.save(update_fields=['profile_picture'])
         return Response({"message": "Profile picture updated successfully", "profile_picture":f"https://drive.google.com/file/d/{file_id}"}, status=status.HTTP_200_OK)
     except Exception as e:
         # Handle any errors during the process
@@ -182,5 +182,14 @@ def get_picture(request):
 def get_user_transactions(request):
     user = request.user
     transactions = Transaction.objects.filter(customer_email=user.email)
+    if not uses_cursor(request):
+        # Existing clients get every transaction, unpaginated
+        serializer = TransactionSerializer(transactions, many=True)
+        return Response({'message': 'User transactions retrieved successfully', 'transactions': serializer.data}, status=200)
+    try:
+        page_size = get_page_size(request, default=20)
+        transactions, pagination = paginate_cursor(request, transactions, '-created_at', page_size)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     serializer = TransactionSerializer(transactions, many=True)
-    return Response({'message': 'User transactions retrieved successfully', 'transactions': serializer.data}, status=200)
\ No newline at end of file
+    return Response({'message': 'User transactions retrieved successfully', 'transactions': serializer.data, 'pagination': pagination}, status=200)
\ No newline at end of file